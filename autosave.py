@@ -0,0 +1,249 @@
+import os
+import threading
+from model import CVModel, CACHE_DIR
+from records import json_default
+
+# Journals of projects that were never saved, and the session pointer
+AUTOSAVE_DIR = os.path.join(CACHE_DIR, "autosave")
+
+# Typed text reaches the journal once typing has paused this long
+AUTOSAVE_DEBOUNCE_MS = 2000
+
+# Model methods a journal record may replay
+JOURNALED_OPERATIONS = {
+    "update_personal_info", "update_section", "toggle_section", "set_raw_latex",
+    "add_entry", "add_entries", "insert_entry", "edit_entry", "delete_entry", "delete_entries"
+}
+
+
+def autosave_paths(project_path, directory=AUTOSAVE_DIR):
+    """(journal, compacting journal, snapshot) paths for a project; None means unsaved"""
+    base = project_path if project_path else os.path.join(directory, "untitled.cvproj")
+    return base + ".journal", base + ".journal.compacting", base + ".autosave"
+
+
+def read_journal(path):
+    """Yield the records of a journal, skipping a line torn by a crash mid-write"""
+    import json
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get("op") in JOURNALED_OPERATIONS:
+                yield record
+
+
+def trim_journal(path):
+    """Cut a line torn by a crash mid-write off the end of a journal, so the
+    next record appended starts on a line of its own"""
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return
+    with f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            f.truncate(end)
+
+
+def _remove_files(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def replay(model, records, after_seq=0):
+    """Apply journal records newer than after_seq to model; returns (count, last seq)"""
+    count, last_seq = 0, after_seq
+    for record in records:
+        if record["seq"] <= after_seq:
+            continue  # Already part of the snapshot
+        getattr(model, record["op"])(*record["args"])
+        count += 1
+        last_seq = record["seq"]
+    return count, last_seq
+
+
+def load_base(model, project_path, snapshot_path):
+    """Load the newest full state into model; returns the journal seq it already includes"""
+    from project_format import read_project
+    if os.path.exists(snapshot_path):
+        data, _ = read_project(snapshot_path)
+        model.load_project_data(data)
+        return data.get("journal_seq", 0)
+    if project_path and os.path.exists(project_path):
+        data, _ = read_project(project_path)
+        model.load_project_data(data)
+    return 0
+
+
+class Autosave:
+    """Append-only journal of model edits with background compaction.
+
+    Every model mutation is appended as one JSON line to a journal next to
+    the project file (or in AUTOSAVE_DIR for an unsaved project), so the
+    cost of autosaving is proportional to the edit. Once the journal holds
+    compact_every records it is set aside, and a background thread folds it
+    into a full snapshot (`<project>.autosave`, compact format) built from
+    files only, never from the live model.
+
+    Records carry increasing sequence numbers and the snapshot stores the
+    last one it includes, so a crash at any point replays each edit exactly
+    once. Saving the project discards the journal and snapshot.
+    """
+
+    def __init__(self, model, directory=AUTOSAVE_DIR, compact_every=500):
+        self.model = model
+        self.directory = directory
+        self.compact_every = compact_every
+        self.project_path = None
+        self._journal = None
+        self._records = 0
+        self._seq = 0
+        self._replaying = False
+        self._compactor = None
+        self._lock = threading.Lock()
+        model.add_listener(self.record)
+
+    def paths(self, project_path=None):
+        return autosave_paths(project_path if project_path is not None else self.project_path, self.directory)
+
+    def attach(self, project_path=None):
+        """Start journaling edits to the project at project_path (None for an unsaved project).
+
+        Edits left in the journal by a session that ended without saving are
+        replayed into the model first; returns how many were replayed. The
+        unsaved project's journal is only replayed if the previous session
+        ended on it, otherwise it holds edits that were abandoned.
+        """
+        self.wait()
+        self._close_journal()
+        self.project_path = project_path
+        journal_path, compacting_path, snapshot_path = self.paths()
+        if project_path is None and self._read_session() != "":
+            _remove_files(self.paths())
+
+        self._seq = 0
+        if any(os.path.exists(path) for path in (journal_path, compacting_path, snapshot_path)):
+            self._replaying = True
+            try:
+                if os.path.exists(snapshot_path):
+                    # The snapshot already includes everything in the project file
+                    self._seq = load_base(self.model, project_path, snapshot_path)
+                for path in (compacting_path, journal_path):
+                    _, self._seq = replay(self.model, read_journal(path), self._seq)
+            finally:
+                self._replaying = False
+        # Sequence numbers restart at every save, so the last one counts the unsaved edits
+        replayed = self._seq
+
+        os.makedirs(os.path.dirname(os.path.abspath(journal_path)), exist_ok=True)
+        trim_journal(journal_path)
+        self._journal = open(journal_path, "a", encoding="utf-8")
+        self._records = sum(1 for _ in read_journal(journal_path)) if replayed else 0
+        self._write_session()
+        if os.path.exists(compacting_path):
+            self.compact()  # Finish the compaction a crash interrupted
+        return replayed
+
+    def record(self, operation, *args):
+        """Model listener: append one record per edit"""
+        if self._replaying or self._journal is None or operation not in JOURNALED_OPERATIONS:
+            return
+        import json
+        self._seq += 1
+        self._journal.write(json.dumps({"seq": self._seq, "op": operation, "args": args},
+                                       separators=(",", ":"), ensure_ascii=False, default=json_default) + "\n")
+        self._journal.flush()
+        self._records += 1
+        if self._records >= self.compact_every:
+            self.compact()
+
+    def compact(self):
+        """Set the journal aside and fold it into the snapshot on a background thread"""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return False
+            journal_path, compacting_path, snapshot_path = self.paths()
+            # A compacting journal left by a crash is folded in first; the
+            # current journal is set aside on the next call
+            if not os.path.exists(compacting_path):
+                self._close_journal()
+                os.replace(journal_path, compacting_path)
+                self._journal = open(journal_path, "a", encoding="utf-8")
+                self._records = 0
+            self._compactor = threading.Thread(
+                target=self._compact, args=(self.project_path, compacting_path, snapshot_path), daemon=True)
+            self._compactor.start()
+            return True
+
+    def _compact(self, project_path, compacting_path, snapshot_path):
+        from project_format import write_binary_project
+        model = CVModel()
+        seq = load_base(model, project_path, snapshot_path)
+        _, seq = replay(model, read_journal(compacting_path), seq)
+        data = model.project_data()
+        data["journal_seq"] = seq
+        write_binary_project(snapshot_path, data)
+        os.remove(compacting_path)
+
+    def wait(self, timeout=None):
+        """Block until a running compaction has finished"""
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout)
+
+    def saved(self, project_path):
+        """The project was saved to project_path: the journal so far is no longer needed"""
+        self.wait()
+        self._close_journal()
+        _remove_files(set(self.paths()) | set(self.paths(project_path)))
+        self.attach(project_path)
+
+    def close(self):
+        """Stop journaling; the journal stays on disk for the next start"""
+        self.wait()
+        self._close_journal()
+        try:
+            self.model.remove_listener(self.record)
+        except ValueError:
+            pass  # Already closed
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _write_session(self):
+        # Lets the next start find the project whose edits may need replaying
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, "session"), "w", encoding="utf-8") as f:
+                f.write(os.path.abspath(self.project_path) if self.project_path else "")
+        except OSError:
+            pass
+
+    def _read_session(self):
+        # Project path of the previous session, "" for an unsaved project, None if unknown
+        try:
+            with open(os.path.join(self.directory, "session"), "r", encoding="utf-8") as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def last_session_project(self):
+        """Project path of the previous session if it left unsaved edits behind, else None"""
+        project_path = self._read_session()
+        if project_path and os.path.exists(project_path) and any(
+                os.path.exists(path) and os.path.getsize(path) > 0 for path in self.paths(project_path)):
+            return project_path
+        return None
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Headless batch renderer for .cvproj files
+
+Usage:
+    python batch.py PROJECTS_DIR_OR_MANIFEST -o OUTPUT_DIR [-j WORKERS]
+
+A manifest is either a JSON list of project paths or a text file with one
+path per line; relative paths are resolved against the manifest's folder.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from model import CVModel
+from engines import make_engine
+
+REPORT_NAME = "batch_report.json"
+
+
+def find_projects(source):
+    """Return the project files named by a directory or manifest"""
+    if os.path.isdir(source):
+        projects = []
+        for dirpath, _, filenames in os.walk(source):
+            projects.extend(os.path.join(dirpath, name) for name in filenames if name.endswith(".cvproj"))
+        return sorted(projects)
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, "r", encoding="utf-8") as f:
+        if source.endswith(".json"):
+            entries = json.load(f)
+        else:
+            entries = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return [os.path.join(base_dir, entry) for entry in entries]
+
+
+def output_names(projects):
+    """Map each project to a unique PDF file name"""
+    names = {}
+    used = set()
+    for project in projects:
+        stem = os.path.splitext(os.path.basename(project))[0]
+        name, n = f"{stem}.pdf", 1
+        while name in used:
+            n += 1
+            name = f"{stem}-{n}.pdf"
+        used.add(name)
+        names[project] = name
+    return names
+
+
+def render_project(project_path, output_path, options=None):
+    """Load, generate and compile one project; never raises"""
+    options = options or {}
+    started = time.perf_counter()
+    result = {"project": project_path, "success": False, "pdf": None, "message": ""}
+    try:
+        engine_options = {"latency": options["fake_latency"]} if options.get("engine") == "fake" else {}
+        model = CVModel(engine=make_engine(options.get("engine", "xelatex"), **engine_options))
+        if options.get("no_cache"):
+            model.pdf_cache = None
+        if options.get("preamble_format"):
+            model.use_preamble_format()
+
+        success, message = model.load_project(project_path)
+        if not success:
+            result["message"] = message
+            return result
+        if options.get("warm_build"):
+            # After loading, so the build directory is keyed by this project
+            model.use_build_dir()
+
+        def on_compiled(success, pdf_path, message):
+            # Copy while the PDF still exists; temporary build dirs vanish after the callback
+            if success:
+                shutil.copyfile(pdf_path, output_path)
+                result["pdf"] = output_path
+            result["success"] = success
+            result["message"] = message
+
+        model.compile_latex(model.generate_latex(), on_compiled)
+    except Exception as e:
+        result["success"] = False
+        result["message"] = f"Render error: {str(e)}"
+    finally:
+        result["seconds"] = round(time.perf_counter() - started, 3)
+    return result
+
+
+def run_batch(projects, output_dir, workers=None, options=None, progress=None):
+    """Render projects over a process pool and write a JSON summary report"""
+    os.makedirs(output_dir, exist_ok=True)
+    names = output_names(projects)
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    results = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render_project, project, os.path.join(output_dir, names[project]), options): project
+            for project in projects
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:  # A crashed worker process
+                result = {"project": futures[future], "success": False, "pdf": None,
+                          "message": f"Worker failed: {str(e)}", "seconds": None}
+            results.append(result)
+            if progress:
+                progress(result)
+
+    results.sort(key=lambda r: r["project"])
+    elapsed = time.perf_counter() - started
+    succeeded = sum(1 for r in results if r["success"])
+    report = {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "workers": workers,
+        "seconds": round(elapsed, 3),
+        "projects_per_second": round(len(results) / elapsed, 2) if elapsed else None,
+        "results": results
+    }
+    with open(os.path.join(output_dir, REPORT_NAME), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render many .cvproj files to PDF without the GUI")
+    parser.add_argument("source", help="Directory searched for .cvproj files, or a manifest file")
+    parser.add_argument("-o", "--output", required=True, help="Directory for PDFs and the summary report")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Always run XeLaTeX, bypassing the PDF cache")
+    parser.add_argument("--warm-build", action="store_true", help="Reuse a per-project build directory")
+    parser.add_argument("--preamble-format", action="store_true", help="Compile against a precompiled preamble")
+    parser.add_argument("--engine", choices=["xelatex", "fake"], default="xelatex",
+                        help="TeX engine; 'fake' needs no TeX installation (for testing and benchmarks)")
+    parser.add_argument("--fake-latency", type=float, default=0.5, help="Seconds per compile for --engine fake")
+    args = parser.parse_args(argv)
+
+    projects = find_projects(args.source)
+    if not projects:
+        print(f"No projects found in {args.source}")
+        return 1
+
+    def progress(result):
+        status = "OK  " if result["success"] else "FAIL"
+        print(f"[{status}] {result['project']}: {result['message'].splitlines()[0] if result['message'] else ''}")
+
+    options = {
+        "no_cache": args.no_cache,
+        "warm_build": args.warm_build,
+        "preamble_format": args.preamble_format,
+        "engine": args.engine,
+        "fake_latency": args.fake_latency
+    }
+    report = run_batch(projects, args.output, args.workers, options, progress)
+    print(f"\n{report['succeeded']}/{report['total']} rendered in {report['seconds']}s "
+          f"({report['workers']} workers). Report: {os.path.join(args.output, REPORT_NAME)}")
+    return 0 if report["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
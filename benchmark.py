@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the LaTeX generation pipeline
+
+Usage:
+    python benchmark.py                          # run and compare with bench_baseline.json, if recorded
+    python benchmark.py --sizes 10 100 1000      # choose entries per section
+    python benchmark.py --save-baseline          # record this machine's numbers as baseline
+    python benchmark.py --output results.json    # write results to a file
+    python benchmark.py --startup                # time GUI startup (needs a display)
+    python benchmark.py --memory                 # memory of entry records vs. dicts
+
+Each stage is timed on synthetic projects with N entries in every list
+section. The suite estimates how each stage scales (time ~ N^k) and flags
+anything clearly worse than linear, which holds on any machine. Wall-clock
+timings are only compared with a baseline recorded on the same machine, so
+the baseline is not part of the repository.
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import platform
+import argparse
+import subprocess
+from model import CVModel
+from sections import SECTION_REGISTRY
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+# Cold-start budget checked by test_startup_budget. Importing the editor
+# took ~105 ms before heavy modules were deferred and ~30 ms after.
+IMPORT_BUDGET_MS = 75
+FIRST_FRAME_BUDGET_MS = 500
+
+# Modules the editor must not import before its first frame
+DEFERRED_MODULES = ["jinja2", "json", "tempfile", "subprocess", "shutil", "pathlib", "hashlib"]
+
+# Run with a scratch autosave directory as argv[1], so the user's last
+# session is neither recovered nor overwritten
+FIRST_FRAME_SCRIPT = """
+import sys
+import time
+started = time.perf_counter()
+import tkinter as tk
+try:
+    root = tk.Tk()
+except tk.TclError:
+    print("no-display")
+    raise SystemExit
+from controller import CVEditorController
+from model import CVModel
+from autosave import Autosave
+model = CVModel()
+CVEditorController(root, model, Autosave(model, directory=sys.argv[1]))
+root.update()
+print((time.perf_counter() - started) * 1000)
+root.destroy()
+"""
+
+# Entry factories per section, matching the fields the editor produces
+ENTRY_FACTORIES = {
+    "education": lambda i: {"degree": f"Degree {i}", "institution": f"University {i}",
+                            "start": str(2000 + i % 20), "end": str(2004 + i % 20),
+                            "details": f"Thesis on topic {i} with additional details"},
+    "experience": lambda i: {"job_title": f"Engineer {i}", "company": f"Company {i}",
+                             "start": str(2000 + i % 20), "end": "Present",
+                             "details": f"Responsible for system {i}, led a team of {i % 9 + 1}"},
+    "research": lambda i: {"project_title": f"Research Project {i}", "institution": f"Lab {i}",
+                           "start": str(2010 + i % 10), "end": "Present",
+                           "details": f"Investigated problem {i} and published the results"},
+    "projects": lambda i: {"project_name": f"project-{i}", "years": "2023--Present",
+                           "description": f"Open source tool number {i} written in Python"},
+    "skills": lambda i: {"category": f"Category {i}", "items": "Python, C++, Java, Git, Docker"},
+    "awards": lambda i: {"year": str(2000 + i % 25), "award_name": f"Award {i}", "organization": f"Society {i}"},
+    "publications": lambda i: {"year": str(2000 + i % 25), "title": f"On the Theory of Problem {i}",
+                               "authors": f"A. Author, B. Author{i}", "venue": f"Journal of Things {i % 40}"},
+    "languages": lambda i: {"language": f"Language {i}", "proficiency": "Fluent"}
+}
+
+def make_synthetic_model(entries_per_section):
+    """CVModel with entries_per_section entries in every list section"""
+    model = CVModel()
+    for section, factory in ENTRY_FACTORIES.items():
+        model.sections[section] = SECTION_REGISTRY[section].to_records(
+            factory(i) for i in range(entries_per_section))
+    model.mark_all_dirty()
+    return model
+
+
+def best_time(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def stage_functions(model, workdir):
+    """Pipeline stages to time; each callable performs the stage once.
+
+    Project save/load stages write their files to workdir.
+    """
+    def generate_cold():
+        model.mark_all_dirty()
+        model.generate_latex()
+
+    def build_content_cold():
+        model.mark_all_dirty()
+        model.build_content_sections()
+
+    def generate_after_edit():
+        # A single edit: only one section should be rebuilt
+        model.edit_entry("awards", 0, model.sections["awards"][0].replace(award_name="Edited"))
+        model.generate_latex()
+
+    stages = {
+        "generate_latex": generate_cold,
+        "build_content_sections": build_content_cold,
+        "generate_latex_after_edit": generate_after_edit
+    }
+    for section in ENTRY_FACTORIES:
+        title = SECTION_REGISTRY[section].title
+        stages[f"build_section[{section}]"] = (lambda s=section, t=title: model.build_section(s, t))
+
+    def build_section_with_specials():
+        # A single special character sends the whole section through per-field escaping
+        entries = model.sections["awards"]
+        original = entries[0]
+        entries[0] = original.replace(organization="Smith & Sons")
+        try:
+            model.build_section("awards", "Awards")
+        finally:
+            entries[0] = original
+
+    stages["build_section[awards, escaped]"] = build_section_with_specials
+
+    for project_format in ("json", "binary"):
+        path = os.path.join(workdir, f"{project_format}.cvproj")
+        model.save_project(path, project_format)
+        stages[f"save_project[{project_format}]"] = (
+            lambda p=path, f=project_format: model.save_project(p, f))
+        stages[f"load_project[{project_format}]"] = (
+            lambda p=path: CVModel().load_project(p))
+    return stages
+
+
+def run_benchmarks(sizes, repeat=3, progress=None):
+    import tempfile
+    results = {}
+    for size in sizes:
+        model = make_synthetic_model(size)
+        model.generate_latex()  # Warm the template cache
+        with tempfile.TemporaryDirectory() as workdir:
+            for stage, fn in stage_functions(model, workdir).items():
+                seconds = best_time(fn, repeat)
+                results.setdefault(stage, {})[str(size)] = seconds
+                if progress:
+                    progress(stage, size, seconds)
+    return results
+
+
+def scaling_exponents(results):
+    """Fit k in time ~ N^k between the two largest sizes of each stage"""
+    exponents = {}
+    for stage, timings in results.items():
+        sizes = sorted(int(size) for size in timings)
+        if len(sizes) < 2:
+            continue
+        small, large = sizes[-2], sizes[-1]
+        t_small, t_large = timings[str(small)], timings[str(large)]
+        if t_small > 0 and t_large > 0:
+            exponents[stage] = math.log(t_large / t_small) / math.log(large / small)
+    return exponents
+
+
+def measure_startup(sizes, repeat=3):
+    """Seconds from creating the editor to its first drawn frame, per project size.
+
+    Also times building every tab, which is what startup cost before tabs
+    were built lazily. Returns None when no display is available.
+    """
+    import tempfile
+    import tkinter as tk
+    from controller import CVEditorController
+    from autosave import Autosave
+
+    results = {}
+    for size in sizes:
+        model = make_synthetic_model(size)
+        for stage in ("startup", "startup_all_tabs"):
+            best = float("inf")
+            for _ in range(repeat):
+                try:
+                    root = tk.Tk()
+                except tk.TclError:
+                    return None
+                autosave_dir = tempfile.TemporaryDirectory()
+                try:
+                    started = time.perf_counter()
+                    app = CVEditorController(root, model, Autosave(model, directory=autosave_dir.name))
+                    if stage == "startup_all_tabs":
+                        app.view.build_all_tabs()
+                    root.update()
+                    best = min(best, time.perf_counter() - started)
+                finally:
+                    root.destroy()  # Also closes the autosave journal
+                    autosave_dir.cleanup()
+            results.setdefault(stage, {})[str(size)] = best
+    return results
+
+
+def measure_entry_memory(count, section="publications"):
+    """Bytes per entry held by count entries of a section, as dicts and as records.
+
+    Field values are decoded from JSON like a loaded project, so each entry
+    owns its strings in both layouts. Returns {"dict": ..., "record": ...}.
+    """
+    import tracemalloc
+    factory = ENTRY_FACTORIES[section]
+    payload = json.dumps([factory(i) for i in range(count)])
+    to_records = SECTION_REGISTRY[section].to_records
+
+    results = {}
+    for layout, build in (("dict", json.loads), ("record", lambda text: to_records(json.loads(text)))):
+        tracemalloc.start()
+        entries = build(payload)
+        results[layout] = tracemalloc.get_traced_memory()[0] / count
+        tracemalloc.stop()
+        del entries
+    return results
+
+
+def _fresh_python(args):
+    # Cached bytecode is what users get; PYTHONDONTWRITEBYTECODE would make
+    # every run pay for compiling the project modules
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)), env=env)
+
+
+def measure_import_time(module="controller", repeat=3):
+    """Best cumulative import time of module in a fresh interpreter (-X importtime).
+
+    Returns (milliseconds, names of every module imported along the way).
+    """
+    best, imported = float("inf"), set()
+    for _ in range(repeat):
+        result = _fresh_python(["-X", "importtime", "-c", f"import {module}"])
+        names = set()
+        for line in result.stderr.splitlines():
+            parts = line.split("|")
+            if not line.startswith("import time:") or len(parts) != 3 or not parts[1].strip().isdigit():
+                continue
+            name = parts[2].strip()
+            names.add(name)
+            if name == module:
+                best = min(best, int(parts[1]) / 1000)
+        imported = names
+    return best, imported
+
+
+def measure_first_frame(repeat=3):
+    """Best time from a fresh interpreter to the editor's first drawn frame, in ms; None without a display"""
+    import tempfile
+    best = None
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as autosave_dir:
+            output = _fresh_python(["-c", FIRST_FRAME_SCRIPT, autosave_dir]).stdout.strip()
+        if output == "no-display" or not output:
+            return None
+        seconds = float(output.splitlines()[-1])
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Return (stage, size, current, baseline) for every regression past tolerance"""
+    regressions = []
+    for stage, timings in results.items():
+        for size, seconds in timings.items():
+            reference = baseline.get("results", {}).get(stage, {}).get(size)
+            # Sub-millisecond timings are too noisy to compare
+            if reference and max(seconds, reference) > 0.001 and seconds > reference * tolerance:
+                regressions.append((stage, size, seconds, reference))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark LaTeX generation at scale")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Entries per section")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage (best time is kept)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Overwrite the baseline with these results")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed slowdown factor vs. baseline")
+    parser.add_argument("--max-exponent", type=float, default=1.5, help="Flag stages scaling worse than N^k")
+    parser.add_argument("--startup", action="store_true", help="Only time GUI startup at each size")
+    parser.add_argument("--memory", action="store_true", help="Only measure entry memory at each size")
+    args = parser.parse_args(argv)
+
+    if args.memory:
+        for size in args.sizes:
+            usage = measure_entry_memory(size)
+            print(f"{'publications':<40} N={size:<6} dict {usage['dict']:7.0f} B/entry   "
+                  f"record {usage['record']:7.0f} B/entry ({usage['record'] / usage['dict']:.0%})")
+        return 0
+
+    if args.startup:
+        import_ms, _ = measure_import_time(repeat=args.repeat)
+        print(f"{'import controller':<40} {import_ms:17.3f} ms (budget {IMPORT_BUDGET_MS} ms)")
+        startup = measure_startup(args.sizes, args.repeat)
+        if startup is None:
+            print("No display available; cannot time GUI startup")
+            return 1
+        for stage, timings in startup.items():
+            for size, seconds in timings.items():
+                print(f"{stage:<40} N={size:<6} {seconds * 1000:10.3f} ms")
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump({"python": platform.python_version(), "startup": startup}, f, indent=2)
+        return 0
+
+    def progress(stage, size, seconds):
+        print(f"{stage:<40} N={size:<6} {seconds * 1000:10.3f} ms")
+
+    results = run_benchmarks(args.sizes, args.repeat, progress)
+    exponents = scaling_exponents(results)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": args.sizes,
+        "results": results,
+        "scaling_exponents": exponents
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    failed = False
+    print("\nScaling (time ~ N^k):")
+    for stage, k in sorted(exponents.items()):
+        flag = "  <-- superlinear" if k > args.max_exponent else ""
+        failed |= bool(flag)
+        print(f"  {stage:<40} k={k:5.2f}{flag}")
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_with_baseline(results, baseline, args.tolerance)
+        print(f"\nCompared with {os.path.basename(args.baseline)} (tolerance x{args.tolerance}):")
+        if (baseline.get("platform"), baseline.get("python")) != (report["platform"], report["python"]):
+            print(f"  note: recorded on {baseline.get('platform')} with Python {baseline.get('python')}; "
+                  f"timings from another setup are not comparable")
+        for stage, size, seconds, reference in regressions:
+            print(f"  {stage} N={size}: {seconds * 1000:.3f} ms vs {reference * 1000:.3f} ms baseline")
+        if not regressions:
+            print("  no regressions")
+        failed |= bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Streaming BibTeX import for the publications section
+
+Usage:
+    python bibtex.py refs.bib my_cv.cvproj    # add the publications of refs.bib to a project
+
+The file is read in chunks and parsed one @entry at a time, so memory use is
+bounded by the largest record rather than the file. Records whose title and
+year match a publication already in the section (or earlier in the file)
+are skipped.
+"""
+
+import re
+import sys
+import argparse
+import unicodedata
+
+CHUNK_SIZE = 1 << 16
+
+# Records added to the model per step of import_publications()
+IMPORT_BATCH_SIZE = 500
+
+MONTH_MACROS = {
+    "jan": "January", "feb": "February", "mar": "March", "apr": "April", "may": "May", "jun": "June",
+    "jul": "July", "aug": "August", "sep": "September", "oct": "October", "nov": "November", "dec": "December"
+}
+
+# First field present wins
+VENUE_FIELDS = ["journal", "booktitle", "school", "institution", "publisher", "howpublished"]
+
+_ENTRY_START = re.compile(r"@\s*([A-Za-z]+)\s*([{(])")
+_DELIMITERS = re.compile(r"[{}()]")
+_BRACES = re.compile(r"[{}]")
+_QUOTE_OR_BRACE = re.compile(r'[{}"]')
+_KEY = re.compile(r"\s*([^,\s]*)\s*,")
+_FIELD_NAME = re.compile(r"\s*([^\s=,{}\"#()]+)\s*=\s*")
+_WORD = re.compile(r"[^\s,#{}\"]+")
+_SPACE = re.compile(r"\s*")
+_SEPARATOR = re.compile(r"\s*,?")
+
+# Accent commands and the combining characters they stand for
+_ACCENTS = {
+    "`": "\u0300", "'": "\u0301", "^": "\u0302", "~": "\u0303", "=": "\u0304", "u": "\u0306", ".": "\u0307",
+    '"': "\u0308", "r": "\u030a", "H": "\u030b", "v": "\u030c", "c": "\u0327", "k": "\u0328"
+}
+_SYMBOLS = {
+    "ss": "ß", "o": "ø", "O": "Ø", "ae": "æ", "AE": "Æ", "oe": "œ", "OE": "Œ", "aa": "å", "AA": "Å",
+    "l": "ł", "L": "Ł", "i": "ı", "j": "ȷ", "&": "&", "%": "%", "$": "$", "#": "#", "_": "_",
+    "{": "{", "}": "}", "\\": " ", ",": " ", " ": " ", "TeX": "TeX", "LaTeX": "LaTeX", "BibTeX": "BibTeX"
+}
+_LATEX_TOKEN = re.compile(
+    r"\\([`'^\"~=.])\s*\{?\s*(\\[ij](?![A-Za-z])|[A-Za-z])\s*\}?"              # \"o, \'{e}
+    r"|\\([uvHckr])(?:\s*\{\s*(\\[ij](?![A-Za-z])|[A-Za-z])\s*\}|\s+([A-Za-z]))"  # \v{c}, \c c
+    r"|\\([A-Za-z]+|.)"                                                         # other commands
+    r"|[{}]"
+)
+
+
+def _scan_block(text, pos, depth, closer):
+    """Return (index of the delimiter closing an entry or -1, brace depth reached)"""
+    for token in _DELIMITERS.finditer(text, pos):
+        char = token.group()
+        if char == "{":
+            depth += 1
+        elif char == closer and depth == 0:
+            return token.start(), depth
+        elif char == "}":
+            depth -= 1
+    return -1, depth
+
+
+def iter_blocks(stream, chunk_size=CHUNK_SIZE):
+    """Yield (entry type, body) for each @type{...} block of a BibTeX text stream"""
+    buffer, pos, eof = "", 0, False
+    while True:
+        match = _ENTRY_START.search(buffer, pos)
+        if match is None:
+            if eof:
+                return
+            # Keep a block start that may continue in the next chunk
+            at = buffer.rfind("@", pos)
+            buffer = buffer[at:] if at != -1 and len(buffer) - at < 64 else ""
+            pos = 0
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            continue
+
+        entry_type = match.group(1).lower()
+        closer = "}" if match.group(2) == "{" else ")"
+        start, body, scanned, depth = match.start(), match.end(), match.end(), 0
+        while True:
+            end, depth = _scan_block(buffer, scanned, depth, closer)
+            if end != -1 or eof:
+                break
+            # Drop consumed text, so the buffer never holds more than this block and a chunk
+            buffer = buffer[start:]
+            body -= start
+            scanned, start = len(buffer), 0
+            chunk = stream.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+        if end == -1:
+            return  # Truncated last block
+        yield entry_type, buffer[body:end]
+        pos = end + 1
+
+
+def _closing(text, pos, pattern, closer):
+    # Index of closer at brace depth 0 after pos, or len(text) when missing
+    depth = 0
+    for token in pattern.finditer(text, pos + 1):
+        char = token.group()
+        if char == closer and depth == 0:
+            return token.start()
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+    return len(text)
+
+
+def _parse_value(body, pos, macros):
+    """Parse a field value (braced, quoted, number or macro, joined by #); returns (value, end)"""
+    parts = []
+    while True:
+        pos = _SPACE.match(body, pos).end()
+        char = body[pos:pos + 1]
+        if char == "{":
+            end = _closing(body, pos, _BRACES, "}")
+            parts.append(body[pos + 1:end])
+            pos = end + 1
+        elif char == '"':
+            end = _closing(body, pos, _QUOTE_OR_BRACE, '"')
+            parts.append(body[pos + 1:end])
+            pos = end + 1
+        else:
+            word = _WORD.match(body, pos)
+            if word is None:
+                break
+            parts.append(macros.get(word.group().lower(), word.group()))
+            pos = word.end()
+        pos = _SPACE.match(body, pos).end()
+        if body[pos:pos + 1] != "#":
+            break
+        pos += 1
+    return "".join(parts), pos
+
+
+def _parse_fields(body, pos, macros):
+    fields = {}
+    while True:
+        match = _FIELD_NAME.match(body, pos)
+        if match is None:
+            return fields
+        fields[match.group(1).lower()], pos = _parse_value(body, match.end(), macros)
+        pos = _SEPARATOR.match(body, pos).end()
+
+
+def iter_bibtex(stream, chunk_size=CHUNK_SIZE):
+    """Yield (entry type, citation key, fields) for each record of a BibTeX text stream.
+
+    Field names are lower-cased and values keep their LaTeX markup; @string
+    macros (and the month abbreviations) are expanded, @comment and
+    @preamble blocks are skipped.
+    """
+    macros = dict(MONTH_MACROS)
+    for entry_type, body in iter_blocks(stream, chunk_size):
+        if entry_type in ("comment", "preamble"):
+            continue
+        if entry_type == "string":
+            macros.update(_parse_fields(body, 0, macros))
+            continue
+        key = _KEY.match(body)
+        if key is None:
+            yield entry_type, body.strip(), {}
+        else:
+            yield entry_type, key.group(1), _parse_fields(body, key.end(), macros)
+
+
+def _latex_token(match):
+    accent, letter = match.group(1), match.group(2)
+    if accent is None:
+        accent, letter = match.group(3), match.group(4) or match.group(5)
+    if accent is not None:
+        base = {"\\i": "i", "\\j": "j"}.get(letter, letter)
+        return base + _ACCENTS[accent]
+    command = match.group(6)
+    if command is not None:
+        return _SYMBOLS.get(command, "")  # Unknown commands keep only their arguments
+    return ""  # Grouping braces
+
+
+def latex_to_text(value):
+    """Plain Unicode text for a BibTeX value: accents resolved, braces and commands removed"""
+    if "\\" in value or "{" in value:
+        value = unicodedata.normalize("NFC", _LATEX_TOKEN.sub(_latex_token, value))
+    return " ".join(value.split())
+
+
+def _split_top_level(text, separator):
+    """Split text on a regex separator that occurs outside braces"""
+    parts, depth, start = [], 0, 0
+    for token in re.finditer(r"[{}]|" + separator, text):
+        char = token.group()
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+        elif depth == 0:
+            parts.append(text[start:token.start()])
+            start = token.end()
+    parts.append(text[start:])
+    return parts
+
+
+def format_authors(value):
+    """"Last, First and Other, A." -> "First Last, A. Other"; "and others" -> "et al." """
+    names = []
+    for name in _split_top_level(value, r"\s+and\s+"):
+        if name.strip() == "others":
+            names.append("et al.")
+            continue
+        # "von Last, Jr, First" -> "First von Last Jr"
+        parts = [latex_to_text(part) for part in _split_top_level(name, ",")]
+        if len(parts) == 2:
+            parts = [parts[1], parts[0]]
+        elif len(parts) >= 3:
+            parts = [parts[2], parts[0], parts[1]]
+        name = " ".join(part for part in parts if part)
+        if name:
+            names.append(name)
+    if len(names) > 1 and names[-1] == "et al.":
+        return ", ".join(names[:-1]) + " et al."
+    return ", ".join(names)
+
+
+def publication_from_bibtex(fields):
+    """Entry of the publications section for a record's fields, or None without a title"""
+    title = latex_to_text(fields.get("title", ""))
+    if not title:
+        return None
+    year = latex_to_text(fields.get("year", "")) or latex_to_text(fields.get("date", ""))[:4]
+    venue = next((latex_to_text(fields[name]) for name in VENUE_FIELDS if fields.get(name)), "")
+    return {"year": year, "title": title, "authors": format_authors(fields.get("author", "")), "venue": venue}
+
+
+def publication_key(entry):
+    """Identity of a publication for de-duplication: title (case, accents and
+    punctuation ignored) and year"""
+    title = unicodedata.normalize("NFKD", str(entry.get("title", "") or "")).casefold()
+    return "".join(char for char in title if char.isalnum()) + "|" + str(entry.get("year", "") or "").strip()
+
+
+class DuplicateIndex:
+    """Hash index of the publications seen so far, keyed by publication_key()"""
+
+    def __init__(self, entries=()):
+        self._keys = {publication_key(entry) for entry in entries}
+
+    def add(self, entry):
+        """Remember entry; returns False if an equal publication was already seen"""
+        key = publication_key(entry)
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        return True
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def import_publications(model, stream, batch_size=IMPORT_BATCH_SIZE, section="publications"):
+    """Add the records of a BibTeX stream to a model's publications.
+
+    A generator: every batch_size records it adds the new publications as
+    one add_entries() call and yields (imported, skipped) so far, so the
+    editor can run one step per idle callback. All batches share an undo
+    group, so the import is undone in one step unless other edits happen
+    in between. Records without a title or already present are skipped.
+    """
+    index = DuplicateIndex(model.sections[section])
+    group = object()
+    imported = skipped = parsed = 0
+    batch = []
+    for _, _, fields in iter_bibtex(stream):
+        parsed += 1
+        publication = publication_from_bibtex(fields)
+        if publication is None or not index.add(publication):
+            skipped += 1
+        else:
+            batch.append(publication)
+        if parsed % batch_size == 0:
+            if batch:
+                model.add_entries(section, batch, group)
+                imported += len(batch)
+                batch = []
+            yield imported, skipped
+    if batch:
+        model.add_entries(section, batch, group)
+        imported += len(batch)
+    yield imported, skipped
+
+
+def main(argv=None):
+    from model import CVModel
+    parser = argparse.ArgumentParser(description="Import BibTeX records into a CV project's publications")
+    parser.add_argument("bibfile", help="BibTeX file to read")
+    parser.add_argument("project", help="Project file to update (either format)")
+    args = parser.parse_args(argv)
+
+    model = CVModel()
+    success, message = model.load_project(args.project)
+    if not success:
+        print(message, file=sys.stderr)
+        return 1
+    try:
+        with open(args.bibfile, "r", encoding="utf-8", errors="replace") as f:
+            for imported, skipped in import_publications(model, f):
+                pass
+    except OSError as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+    success, message = model.save_project(args.project)
+    print(f"Imported {imported} publications, skipped {skipped} duplicates or untitled records. {message}")
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
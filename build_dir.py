@@ -0,0 +1,65 @@
+import os
+import shutil
+import hashlib
+import threading
+
+# Compiled PDF is copied here after each successful run, so callers keep a
+# path that does not move while the working files are reused.
+OUTPUT_NAME = "output.pdf"
+
+
+def project_slug(project_path):
+    """Stable directory name for a project file (or unsaved project)"""
+    if not project_path:
+        return "untitled"
+    abspath = os.path.abspath(project_path)
+    stem = os.path.splitext(os.path.basename(abspath))[0] or "project"
+    digest = hashlib.sha1(abspath.encode("utf-8")).hexdigest()[:12]
+    return f"{stem}-{digest}"
+
+
+class BuildDirectory:
+    """Persistent XeLaTeX working directory reused across compiles of one project.
+
+    Keeping cv.aux, cv.log and friends between runs lets XeLaTeX start from
+    warm state. The directory is wiped when it grows past max_bytes or when
+    the model switches to another project.
+    """
+
+    def __init__(self, root, project_path=None, max_bytes=50 * 1024 * 1024):
+        self.root = os.path.abspath(str(root))
+        self.project_path = project_path
+        self.max_bytes = max_bytes
+        self.path = os.path.join(self.root, project_slug(project_path))
+        self.lock = threading.Lock()
+
+    def size(self):
+        total = 0
+        for dirpath, _, filenames in os.walk(self.path):
+            for name in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, name))
+                except OSError:
+                    pass
+        return total
+
+    def prepare(self):
+        """Create the directory, starting cold again if it outgrew its budget"""
+        if os.path.isdir(self.path) and self.size() > self.max_bytes:
+            self.clean()
+        os.makedirs(self.path, exist_ok=True)
+        return self.path
+
+    def clean(self):
+        """Remove the directory; refuses to touch anything outside root"""
+        if os.path.dirname(self.path) != self.root:
+            raise ValueError(f"Refusing to clean {self.path}: not inside {self.root}")
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def publish(self, pdf_path):
+        """Atomically copy a freshly built PDF to the stable output path"""
+        output_path = os.path.join(self.path, OUTPUT_NAME)
+        tmp_path = output_path + ".tmp"
+        shutil.copyfile(pdf_path, tmp_path)
+        os.replace(tmp_path, output_path)
+        return output_path
@@ -0,0 +1,122 @@
+import threading
+
+
+class CompileJob:
+    """One snapshot of generated LaTeX waiting for (or undergoing) compilation"""
+
+    def __init__(self, latex_content, handlers):
+        self.latex_content = latex_content
+        self.handlers = handlers
+        self.cancel_event = threading.Event()
+        self.delivered = False
+
+    def cancel(self):
+        self.cancel_event.set()
+
+
+class CompileQueue:
+    """Single background worker that runs at most one compile at a time.
+
+    Submitting while another job is pending replaces it, and submitting new
+    content while a compile is running cancels that run, while submitting
+    the content being compiled joins that run. Only the most
+    recently submitted job ever reports a result, so stale compiles cannot
+    overwrite newer ones. Result handlers of superseded jobs are carried
+    over to the newer job, so e.g. a "Generate PDF" request still gets a
+    PDF when a live preview replaces it.
+
+    compile_fn(latex_content, callback, cancel_event, progress) is expected to
+    call callback(success, pdf_path, message) exactly once, as
+    CVModel.compile_latex does. on_progress receives the progress events of
+    the current job only.
+    """
+
+    def __init__(self, compile_fn, on_progress=None):
+        self.compile_fn = compile_fn
+        self.on_progress = on_progress
+        self._cond = threading.Condition()
+        self._pending = None
+        self._running = None
+        self._latest = None
+        self._thread = None
+        self._closed = False
+
+    def submit(self, latex_content, on_result):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Compile queue is shut down")
+            handlers = []
+            if self._latest is not None and not self._latest.delivered:
+                # Earlier superseded jobs already handed their handlers to _latest
+                handlers.extend(self._latest.handlers)
+            if on_result not in handlers:
+                handlers.append(on_result)
+            running = self._running
+            if (running is not None and running.latex_content == latex_content
+                    and not running.delivered and not running.cancel_event.is_set()):
+                # The running compile already produces this result; it reports to everyone
+                running.handlers.extend(h for h in handlers if h not in running.handlers)
+                self._latest = running
+                self._pending = None
+                return running
+            job = CompileJob(latex_content, handlers)
+            self._latest = job
+            self._pending = job  # Any older pending job is dropped here
+            if running is not None:
+                running.cancel()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, name="compile-worker", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return job
+
+    def is_busy(self):
+        with self._cond:
+            return self._pending is not None or self._running is not None
+
+    def cancel(self):
+        """Drop the pending job and stop the running one; no result is reported"""
+        with self._cond:
+            self._pending = None
+            if self._running is not None:
+                self._running.cancel()
+            if self._latest is not None:
+                self._latest.delivered = True  # Its handlers must not move to the next job
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._pending = None
+            if self._running is not None:
+                self._running.cancel()
+            self._cond.notify()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                job, self._pending = self._pending, None
+                self._running = job
+
+            try:
+                self.compile_fn(job.latex_content, lambda *result: self._deliver(job, result),
+                                job.cancel_event, lambda *state: self._report(job, state))
+            finally:
+                with self._cond:
+                    self._running = None
+
+    def _report(self, job, state):
+        if self.on_progress is not None and job is self._latest and not job.cancel_event.is_set():
+            self.on_progress(*state)
+
+    def _deliver(self, job, result):
+        with self._cond:
+            current = job is self._latest and not job.cancel_event.is_set()
+            if current:
+                job.delivered = True
+        if current:
+            for handler in job.handlers:
+                handler(*result)
@@ -0,0 +1,187 @@
+import os
+import time
+import signal
+import threading
+from collections import deque
+
+try:
+    import resource
+except ImportError:  # Windows: wall-clock timeout and cancel only
+    resource = None
+
+# Output of a child whose allocation failed under RLIMIT_AS (kpathsea's
+# xmalloc, the C/C++ runtimes, Python)
+ALLOCATION_FAILURES = ("memory exhausted", "out of memory", "cannot allocate memory", "bad_alloc", "memoryerror")
+
+
+def kill_process_tree(process):
+    """Kill a compile process along with helpers it spawned (mktextfm, kpsewhich)"""
+    if os.name == "posix":
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+            return
+        except OSError:
+            pass
+    process.kill()
+
+
+class CompileResult:
+    """Outcome of one engine run; status is ok, failed, timeout, cancelled, cpu-limit or memory-limit"""
+
+    def __init__(self, status, returncode, stdout, stderr, elapsed):
+        self.status = status
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.elapsed = elapsed
+
+    @property
+    def stopped(self):
+        """True when the runner killed the process rather than it exiting on its own"""
+        return self.status in ("timeout", "cancelled", "cpu-limit", "memory-limit")
+
+
+class CompileRunner:
+    """Run a TeX engine with a wall-clock timeout, optional CPU/memory limits and cancellation.
+
+    CPU and memory limits are set on the child with prlimit (or ulimit where
+    that is missing) and only apply on POSIX.
+    cancel() stops every run in progress; a per-run cancel_event does the same
+    for a single run.
+    """
+
+    def __init__(self, timeout=300, cpu_seconds=None, memory_bytes=None, poll_interval=0.1, tail_lines=200):
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_bytes
+        self.poll_interval = poll_interval
+        self.tail_lines = tail_lines
+        self._active = set()
+        self._lock = threading.Lock()
+
+    def _limit_process(self, pid):
+        # Applied from outside, as preexec_fn can deadlock in a process with other threads
+        try:
+            if self.cpu_seconds:
+                resource.prlimit(pid, resource.RLIMIT_CPU, (self.cpu_seconds, self.cpu_seconds + 1))
+            if self.memory_bytes:
+                resource.prlimit(pid, resource.RLIMIT_AS, (self.memory_bytes, self.memory_bytes))
+        except ProcessLookupError:
+            pass  # Already exited
+
+    def _limit_command(self, command):
+        # Without prlimit (e.g. macOS) the shell sets the limits before exec'ing the engine
+        limits = []
+        if self.cpu_seconds:
+            limits.append(f"ulimit -t {int(self.cpu_seconds)}")
+        if self.memory_bytes:
+            limits.append(f"ulimit -v {int(self.memory_bytes) // 1024}")
+        return ["/bin/sh", "-c", "; ".join(limits) + '; exec "$@"', "sh", *command]
+
+    def cancel(self):
+        with self._lock:
+            for event in self._active:
+                event.set()
+
+    def run(self, command, cwd=None, env=None, cancel_event=None, on_line=None, log_path=None):
+        """Run command to completion or until stopped.
+
+        Output (stderr merged into stdout) is streamed line by line: written
+        to log_path if given and passed to on_line as it arrives. Only the
+        last tail_lines lines are kept in the returned result.
+        """
+        import subprocess
+        cancel_event = cancel_event or threading.Event()
+        limited = resource is not None and (self.cpu_seconds or self.memory_bytes)
+        prlimit = limited and hasattr(resource, "prlimit")
+        if limited and not prlimit:
+            command = self._limit_command(command)
+        started = time.monotonic()
+        process = subprocess.Popen(
+            command,
+            cwd=cwd,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            errors="replace",
+            bufsize=1,
+            start_new_session=(os.name == "posix")  # Own process group, so helpers die with it
+        )
+        if prlimit:
+            self._limit_process(process.pid)
+        tail = deque(maxlen=self.tail_lines)
+        try:
+            log = open(log_path, "w", encoding="utf-8") if log_path else None
+        except OSError:
+            log = None  # Still drain the pipe and report; the log file is a convenience
+        reader = threading.Thread(target=self._pump, args=(process.stdout, tail, on_line, log), daemon=True)
+        reader.start()
+        
+        with self._lock:
+            self._active.add(cancel_event)
+        try:
+            status = None
+            while True:
+                try:
+                    process.wait(timeout=self.poll_interval)
+                    break
+                except subprocess.TimeoutExpired:
+                    if cancel_event.is_set():
+                        status = "cancelled"
+                    elif self.timeout and time.monotonic() - started > self.timeout:
+                        status = "timeout"
+                    if status:
+                        kill_process_tree(process)
+                        process.wait()
+                        break
+        finally:
+            with self._lock:
+                self._active.discard(cancel_event)
+        reader.join(timeout=5)
+
+        if status is None:
+            status = "ok" if process.returncode == 0 else "failed"
+            if status == "failed" and limited:
+                status = self._limit_status(process.returncode, tail)
+        return CompileResult(status, process.returncode, "".join(tail), "", time.monotonic() - started)
+
+    def _limit_status(self, returncode, tail):
+        # Which configured limit, if any, made the child fail
+        if self.memory_bytes and any(
+                failure in line.lower() for line in list(tail)[-20:] for failure in ALLOCATION_FAILURES):
+            return "memory-limit"
+        if self.cpu_seconds and returncode in (-signal.SIGKILL, -getattr(signal, "SIGXCPU", 0)):
+            return "cpu-limit"
+        # Failed allocations the child did not report end in abort() or a bad pointer
+        if self.memory_bytes and returncode in (-signal.SIGABRT, -signal.SIGSEGV, -signal.SIGKILL):
+            return "memory-limit"
+        return "failed"
+
+    def _pump(self, stream, tail, on_line, log):
+        try:
+            for line in stream:
+                tail.append(line)
+                if log:
+                    log.write(line)
+                if on_line:
+                    try:
+                        on_line(line)
+                    except Exception:
+                        pass  # Keep draining, or the child blocks on a full pipe
+        finally:
+            stream.close()
+            if log:
+                log.close()
+
+    def describe(self, result):
+        """Human readable reason for a run the runner had to stop"""
+        if result.status == "timeout":
+            return f"Compilation timed out after {self.timeout} s and was stopped."
+        if result.status == "cpu-limit":
+            return f"Compilation exceeded the CPU time limit of {self.cpu_seconds} s and was stopped."
+        if result.status == "memory-limit":
+            return f"Compilation ran out of memory (limit {self.memory_bytes / 2 ** 20:.0f} MB) and was stopped."
+        if result.status == "cancelled":
+            return "Compilation cancelled"
+        return None
@@ -1,50 +1,257 @@
-import threading
-import shutil
+import os
 from model import CVModel
 from view import CVEditorView
+from autosave import Autosave, AUTOSAVE_DEBOUNCE_MS
+from compile_queue import CompileQueue
+from preview import PREVIEW_DEBOUNCE_MS, render_pdf_pages
 
 class CVEditorController:
-    def __init__(self, root):
+    def __init__(self, root, model=None, autosave=None):
         self.root = root
-        self.model = CVModel()
+        self.model = model or CVModel()
+        
+        # Replay edits a crashed session left behind before any tab binds model data
+        self.autosave = autosave or Autosave(self.model)
+        self._autosave_after = None
+        project_path = self.autosave.last_session_project()
+        if project_path and not self.model.load_project(project_path)[0]:
+            project_path = None
+        recovered = self.autosave.attach(project_path)
+        root.protocol("WM_DELETE_WINDOW", self.close_window)
+        root.bind("<Destroy>", self._window_destroyed, add="+")
+        
         self.view = CVEditorView(root, self)
+        if recovered:
+            self.view.show_message(f"Recovered {recovered} unsaved edit{'s' if recovered != 1 else ''}")
+        
+        # One compile at a time; newer requests supersede older ones
+        self.compile_queue = CompileQueue(
+            self.model.compile_latex,
+            on_progress=lambda done, expected: self.root.after(0, self.view.set_progress, done, expected)
+        )
         
-        # Initialize view with model data
-        self.load_data_to_view()
+        # Live preview state
+        self.live_preview = False
+        self._preview_after = None
+        self._preview_latex = None
+        
+        # Tabs bind model data when they are first built; load_data_to_view()
+        # is only needed to push changes into tabs that already exist
     
     def load_data_to_view(self):
+        """Push model data into the widgets of tabs that have been built"""
         # Personal info
         for key, value in self.model.personal_info.items():
             self.view.set_personal_field(key, value)
         
-        # Sections content
-        for section, content in self.model.sections.items():
-            self.view.set_section_content(section, content)
+        # Sections content; tabs not built yet read the model when they are,
+        # so the sections of a lazily loaded project stay undecoded
+        for section in self.model.sections:
+            if self.view.is_section_built(section):
+                self.view.set_section_content(section, self.model.sections[section])
         
         # Section visibility
         for section, visible in self.model.section_visibility.items():
             self.view.set_section_visibility(section, visible)
+        
+        # Raw LaTeX opt-outs
+        for section in self.model.sections:
+            self.view.set_section_raw_latex(section, section in self.model.raw_latex_sections)
+    
+    def close_window(self):
+        """Journal text typed since the last autosave, then close the editor"""
+        if self._autosave_after is not None:
+            self.root.after_cancel(self._autosave_after)
+            self._autosave_after = None
+        self.sync_from_view()
+        self.autosave.close()
+        self.root.destroy()
+    
+    def _window_destroyed(self, event):
+        # Children's <Destroy> events reach the root's bindings too
+        if event.widget is self.root:
+            self.autosave.close()
+    
+    def view_edited(self):
+        """A widget changed; its value is pulled by sync_from_view() when needed"""
+        self.schedule_preview()
+        self.schedule_autosave()
+    
+    def schedule_autosave(self, delay=AUTOSAVE_DEBOUNCE_MS):
+        """Journal typed text once typing has paused for `delay` ms"""
+        if self._autosave_after is not None:
+            self.root.after_cancel(self._autosave_after)
+        self._autosave_after = self.root.after(delay, self._autosave_edits)
+    
+    def _autosave_edits(self):
+        self._autosave_after = None
+        self.sync_from_view()
+    
+    def sync_from_view(self):
+        """Copy values of edited widgets into the model before rendering or saving"""
+        personal, sections = self.view.pull_edits()
+        for key, value in personal.items():
+            self.model.update_personal_info(key, value)
+        for section, content in sections.items():
+            self.model.update_section(section, content)
     
     def update_personal(self, key, value):
         self.model.update_personal_info(key, value)
+        self.schedule_preview()
     
     def update_section(self, section, content):
         self.model.update_section(section, content)
+        self.schedule_preview()
     
     def toggle_section(self, section, visible):
         self.model.toggle_section(section, visible)
+        self.schedule_preview()
+    
+    def set_raw_latex(self, section, raw):
+        self.model.set_raw_latex(section, raw)
+        self.schedule_preview()
+    
+    def add_entry(self, section, entry):
+        self.model.add_entry(section, entry)
+        self.schedule_preview()
+    
+    def edit_entry(self, section, idx, entry):
+        self.model.edit_entry(section, idx, entry)
+        self.schedule_preview()
+    
+    def delete_entry(self, section, idx):
+        self.model.delete_entry(section, idx)
+        self.schedule_preview()
+    
+    def undo(self):
+        self._step_history(self.model.undo, "Nothing to undo")
+    
+    def redo(self):
+        self._step_history(self.model.redo, "Nothing to redo")
+    
+    def _step_history(self, step, empty_message):
+        # Typing not yet pulled from the widgets becomes its own step first
+        self.sync_from_view()
+        calls = step()
+        if calls is None:
+            self.view.show_message(empty_message)
+            return
+        for operation, args in calls:
+            self.show_model_change(operation, args)
+        self.schedule_preview()
+    
+    def show_model_change(self, operation, args):
+        """Update only the widgets a model operation touched"""
+        if operation == "update_personal_info":
+            self.view.set_personal_field(*args)
+        elif operation == "update_section":
+            section = args[0]
+            self.view.set_section_content(section, self.model.sections[section])
+        elif operation == "toggle_section":
+            self.view.set_section_visibility(*args)
+        elif operation == "set_raw_latex":
+            self.view.set_section_raw_latex(*args)
+        elif operation == "insert_entry":
+            self.view.insert_entry_row(*args)
+        elif operation == "add_entries":
+            self.view.append_entry_rows(*args)
+        elif operation == "delete_entries":
+            self.view.delete_entry_rows(*args)
+        elif operation == "edit_entry":
+            self.view.update_entry_row(*args)
+        elif operation == "delete_entry":
+            self.view.delete_entry_row(*args)
+    
+    def filter_entries(self, section, query):
+        """Show only the entries of a list section that contain every word of query"""
+        positions = self.model.search_entries(section, query) if query.strip() else None
+        self.view.show_entry_rows(section, positions)
+    
+    def set_live_preview(self, enabled):
+        self.live_preview = enabled
+        if enabled:
+            self.view.show_preview_pane()
+            self.schedule_preview(delay=0)
+        else:
+            if self._preview_after is not None:
+                self.root.after_cancel(self._preview_after)
+                self._preview_after = None
+            self._preview_latex = None
+            self.view.hide_preview_pane()
+    
+    def schedule_preview(self, delay=PREVIEW_DEBOUNCE_MS):
+        """Debounce edits: recompile once typing has paused for `delay` ms"""
+        if not self.live_preview:
+            return
+        if self._preview_after is not None:
+            self.root.after_cancel(self._preview_after)
+        self._preview_after = self.root.after(delay, self.refresh_preview)
+    
+    def refresh_preview(self):
+        self._preview_after = None
+        self.sync_from_view()
+        try:
+            latex_content = self.model.generate_latex()
+        except ValueError as e:
+            self.view.show_preview_status(str(e))
+            return
+        if latex_content == self._preview_latex:
+            return  # Nothing changed since the last preview
+        self._preview_latex = latex_content
+        self.view.show_preview_status("Rendering preview...")
+        self.compile_queue.submit(latex_content, self.handle_preview_result)
+    
+    def handle_preview_result(self, success, pdf_path, message):
+        # Runs on the compile worker; rasterize here and hand images to the Tk thread
+        if not success:
+            self.root.after(0, self.view.show_preview_status, message.splitlines()[0])
+            return
+        pages = render_pdf_pages(pdf_path)
+        if pages is None:
+            self.root.after(0, self.view.show_preview_status,
+                            "Install poppler-utils (pdftoppm) to see page previews")
+        else:
+            self.root.after(0, self.view.show_preview_pages, pages)
     
     def generate_pdf(self):
         self.view.start_progress()
         self.view.show_message("Generating PDF...")
         
-        def generate_thread():
+        # Snapshot the model on the Tk thread; the worker only sees this string
+        self.sync_from_view()
+        try:
             latex_content = self.model.generate_latex()
-            self.model.compile_latex(latex_content, self.handle_compilation_result)
-        
-        threading.Thread(target=generate_thread, daemon=True).start()
+        except ValueError as e:
+            self.view.stop_progress()
+            self.view.show_message(str(e), True)
+            return
+        self.compile_queue.submit(latex_content, self.handle_compilation_result)
+    
+    def cancel_compile(self):
+        """Stop the running XeLaTeX process and forget any queued request"""
+        if not self.compile_queue.is_busy():
+            return
+        self.compile_queue.cancel()
+        self._preview_latex = None  # Let the next preview refresh recompile
+        self.view.stop_progress()
+        self.view.show_message("Compilation cancelled")
     
     def handle_compilation_result(self, success, pdf_path, message):
+        # Runs on the compile worker, where a freshly built PDF may vanish once
+        # this returns; keep a copy and finish on the Tk thread
+        if success:
+            import shutil
+            import tempfile
+            try:
+                fd, kept_path = tempfile.mkstemp(prefix="cv-", suffix=".pdf")
+                os.close(fd)
+                shutil.copyfile(pdf_path, kept_path)
+                pdf_path = kept_path
+            except OSError as e:
+                success, pdf_path, message = False, None, f"Error saving/opening PDF: {str(e)}"
+        self.root.after(0, self.show_compilation_result, success, pdf_path, message)
+    
+    def show_compilation_result(self, success, pdf_path, message):
         self.view.stop_progress()
         self.view.show_message(message)
         
@@ -56,27 +263,74 @@ class CVEditorController:
                 # Prompt user for save location with suggested filename
                 save_path = self.view.ask_pdf_save_path(first_name, last_name)
                 if save_path:
+                    import shutil
                     shutil.copyfile(pdf_path, save_path)
                     self.view.open_pdf(save_path)
                 else:
                     self.view.show_message("PDF was generated but not saved.")
             except Exception as e:
                 self.view.show_message(f"Error saving/opening PDF: {str(e)}", True)
+            finally:
+                try:
+                    os.remove(pdf_path)
+                except OSError:
+                    pass
         else:
             self.view.show_message(message, True)
     
     def save_project(self):
         file_path = self.view.ask_save_path()
         if file_path:
+            self.sync_from_view()
             success, message = self.model.save_project(file_path)
             self.view.show_message(message)
-            if not success:
+            if success:
+                self.autosave.saved(file_path)
+            else:
                 self.view.show_message(message, True)
     
+    def import_bibtex(self):
+        """Add the records of a .bib file to the publications, one batch per idle callback"""
+        file_path = self.view.ask_bibtex_path()
+        if not file_path:
+            return
+        from bibtex import import_publications
+        self.sync_from_view()
+        try:
+            stream = open(file_path, "r", encoding="utf-8", errors="replace")
+        except OSError as e:
+            self.view.show_message(f"Import failed: {str(e)}", True)
+            return
+        self.view.start_progress()
+        self._import_step(stream, import_publications(self.model, stream), (0, 0))
+    
+    def _import_step(self, stream, steps, counts):
+        shown = len(self.model.sections["publications"])
+        try:
+            counts = next(steps)
+        except StopIteration:
+            stream.close()
+            self.view.stop_progress()
+            self.view.show_message(f"Imported {counts[0]} publications "
+                                   f"({counts[1]} duplicates or untitled records skipped)")
+            self.schedule_preview()
+            return
+        except OSError as e:
+            stream.close()
+            self.view.stop_progress()
+            self.view.show_message(f"Import failed: {str(e)}", True)
+            return
+        self.view.append_entry_rows("publications", self.model.sections["publications"][shown:])
+        self.view.show_message(f"Importing publications... {counts[0]} added")
+        self.root.after(1, self._import_step, stream, steps, counts)
+    
     def load_project(self):
         file_path = self.view.ask_open_path()
         if file_path:
             success, message = self.model.load_project(file_path)
             if success:
+                if self.autosave.attach(file_path):
+                    message += " (with unsaved edits recovered)"
                 self.load_data_to_view()
+                self.schedule_preview()
             self.view.show_message(message, not success)
\ No newline at end of file
@@ -0,0 +1,61 @@
+import os
+import sys
+from pdf_cache import engine_version
+
+FAKE_ENGINE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_xelatex.py")
+
+
+class XeLaTeXEngine:
+    """The real XeLaTeX binary"""
+
+    name = "xelatex"
+    supports_formats = True
+
+    def __init__(self, executable="xelatex"):
+        self.executable = executable
+
+    def version(self):
+        return engine_version(self.executable)
+
+    def command(self, tex_path, output_dir, format_args=()):
+        return [self.executable, "-interaction=nonstopmode", *format_args,
+                "-output-directory", output_dir, tex_path]
+
+
+class FakeEngine:
+    """Stand-in for XeLaTeX that needs no TeX installation.
+
+    Runs fake_xelatex.py as a real subprocess, so the runner, log streaming,
+    timeouts and cancellation are exercised exactly as with XeLaTeX. It prints
+    XeTeX-like output with page markers, writes a minimal valid PDF, and can
+    be slowed down (latency, in seconds per compile) or made to fail.
+    """
+
+    name = "fake"
+    supports_formats = False
+
+    def __init__(self, latency=0.0, fail=False, chars_per_page=3000):
+        self.latency = latency
+        self.fail = fail
+        self.chars_per_page = chars_per_page
+
+    def version(self):
+        return f"FakeTeX 1.0 (latency={self.latency}, fail={self.fail})"
+
+    def command(self, tex_path, output_dir, format_args=()):
+        command = [sys.executable, FAKE_ENGINE_SCRIPT,
+                   "--latency", str(self.latency),
+                   "--chars-per-page", str(self.chars_per_page),
+                   "-output-directory", output_dir]
+        if self.fail:
+            command.append("--fail")
+        return command + [tex_path]
+
+
+def make_engine(name="xelatex", **options):
+    """Build an engine by name ("xelatex" or "fake")"""
+    if name == "fake":
+        return FakeEngine(**options)
+    if name == "xelatex":
+        return XeLaTeXEngine(**options)
+    raise ValueError(f"Unknown engine: {name}")
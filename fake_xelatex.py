@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Fake XeLaTeX used by engines.FakeEngine for tests and benchmarks
+
+Usage:
+    python fake_xelatex.py [--latency S] [--fail] [-output-directory DIR] FILE.tex
+
+Prints output shaped like XeTeX's terminal log, then writes FILE.pdf with
+one blank page per --chars-per-page characters of input. With --fail (or a
+`\\fakeerror` in the document) it reports a TeX error and writes no PDF.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+
+def minimal_pdf(pages):
+    """Bytes of a valid PDF with the given number of blank A4 pages"""
+    kids = " ".join(f"{3 + i} 0 R" for i in range(pages))
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>"
+    ]
+    objects += ["<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] >>"] * pages
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("ascii")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("ascii")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    return bytes(out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fake XeLaTeX")
+    parser.add_argument("--version", action="store_true")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--chars-per-page", type=int, default=3000)
+    parser.add_argument("--fail", action="store_true")
+    parser.add_argument("-output-directory", dest="output_directory", default=None)
+    parser.add_argument("-interaction", default=None)
+    parser.add_argument("tex_path", nargs="?")
+    args = parser.parse_args(argv)
+
+    if args.version:
+        print("FakeTeX 1.0 (XeLaTeX stand-in)")
+        return 0
+
+    output_dir = args.output_directory or os.path.dirname(os.path.abspath(args.tex_path))
+    jobname = os.path.splitext(os.path.basename(args.tex_path))[0]
+    with open(args.tex_path, "r", encoding="utf-8") as f:
+        source = f.read()
+    pages = max(1, len(source) // args.chars_per_page + 1)
+
+    print("This is FakeTeX, Version 3.141592653-2.6-0.999995 (XeLaTeX stand-in)")
+    print(f"({args.tex_path}")
+    print("LaTeX2e <2023-11-01> patch level 1")
+    print("(/usr/share/texlive/texmf-dist/tex/latex/moderncv/moderncv.cls)", flush=True)
+
+    if args.fail or "\\fakeerror" in source:
+        time.sleep(args.latency / 2)
+        print("! Undefined control sequence.")
+        print("l.42 \\fakeerror")
+        print("")
+        print(f"No pages of output.\nTranscript written on {jobname}.log.", flush=True)
+        return 1
+
+    for page in range(1, pages + 1):
+        time.sleep(args.latency / pages)
+        print(f"[{page}]", end=" " if page % 10 else "\n", flush=True)
+    print(")")
+
+    pdf = minimal_pdf(pages)
+    with open(os.path.join(output_dir, f"{jobname}.pdf"), "wb") as f:
+        f.write(pdf)
+    with open(os.path.join(output_dir, f"{jobname}.log"), "w", encoding="utf-8") as f:
+        f.write(f"This is FakeTeX (fake log for {jobname}.tex)\n")
+    print(f"Output written on {jobname}.pdf ({pages} page{'s' if pages != 1 else ''}, {len(pdf)} bytes).")
+    print(f"Transcript written on {jobname}.log.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import sys
+import threading
+
+# Metric-compatible replacements, best match first
+FONT_SUBSTITUTES = {
+    "Arial": ["Liberation Sans", "Arimo", "Helvetica", "Nimbus Sans", "TeX Gyre Heros", "FreeSans", "DejaVu Sans"],
+    "Helvetica": ["Liberation Sans", "Arimo", "Nimbus Sans", "TeX Gyre Heros", "Arial", "FreeSans"],
+    "Times New Roman": ["Liberation Serif", "Tinos", "Nimbus Roman", "TeX Gyre Termes", "FreeSerif"],
+    "Courier New": ["Liberation Mono", "Cousine", "Nimbus Mono PS", "TeX Gyre Cursor", "FreeMono"],
+    "Calibri": ["Carlito", "Liberation Sans"],
+    "Cambria": ["Caladea", "Liberation Serif"]
+}
+
+# None leaves font selection to fontspec's default (Latin Modern), which
+# ships with every TeX distribution
+DEFAULT_FALLBACK = None
+
+# Platforms where XeTeX finds system fonts through fontconfig. There, a
+# missing fc-list means no font is assumed installed; on Windows and macOS
+# XeTeX uses the native font APIs and fonts are assumed to resolve
+FONTCONFIG_PLATFORM = sys.platform not in ("win32", "cygwin", "darwin")
+
+_families = None
+_resolved = {}
+_lock = threading.Lock()
+
+
+def installed_families():
+    """Return the set of installed font family names (lowercase), probed once.
+
+    Returns None when fc-list is unavailable on Windows or macOS, in which
+    case fonts are assumed to resolve, and an empty set elsewhere.
+    """
+    global _families
+    with _lock:
+        if _families is None:
+            try:
+                import subprocess
+                result = subprocess.run(["fc-list", ":", "family"], capture_output=True, text=True)
+            except (OSError, subprocess.SubprocessError):
+                _families = False
+            else:
+                families = set()
+                for line in result.stdout.splitlines():
+                    # Localized names are listed comma separated on one line
+                    for name in line.split(","):
+                        if name.strip():
+                            families.add(name.strip().lower())
+                _families = families if result.returncode == 0 else False
+        if _families is False:
+            return set() if FONTCONFIG_PLATFORM else None
+        return _families
+
+
+def resolve_font(name):
+    """Return name if installed, otherwise the closest available substitute.
+
+    Returns None when nothing suitable is installed; the template then skips
+    \\setmainfont instead of letting XeLaTeX run mktextfm for every shape.
+    """
+    with _lock:
+        if name in _resolved:
+            return _resolved[name]
+    families = installed_families()
+    if families is None or name.lower() in families:
+        resolved = name
+    else:
+        candidates = FONT_SUBSTITUTES.get(name, [])
+        resolved = next((c for c in candidates if c.lower() in families), DEFAULT_FALLBACK)
+    with _lock:
+        _resolved[name] = resolved
+    return resolved
+
+
+def reset_font_cache():
+    """Forget probe results, e.g. after installing new fonts"""
+    global _families
+    with _lock:
+        _families = None
+        _resolved.clear()
@@ -0,0 +1,62 @@
+from collections import deque
+
+# Undo steps kept per project; the oldest are dropped first
+HISTORY_LIMIT = 1000
+
+
+class History:
+    """Undo/redo stacks of model operations.
+
+    A step is a pair of (operation, args) calls: one that reverts an edit and
+    one that reapplies it, where operation names a CVModel method. Consecutive
+    edits recorded with the same group token (e.g. the batches of an import)
+    form one step with several calls. Steps hold references to the values they replace rather
+    than copies of the project, and entries are replaced rather than mutated
+    in place, so every step shares all unchanged data with the live model and
+    with other steps. 1000 steps on a 5000-entry section cost about as much
+    memory as the 1000 edits themselves, and undo or redo only applies the
+    calls of one step.
+    """
+
+    def __init__(self, limit=HISTORY_LIMIT):
+        self._undo = deque(maxlen=limit)
+        self._redo = []
+        self._group = None
+
+    def record(self, undo, redo, group=None):
+        if group is not None and group is self._group and self._undo:
+            # Joins the newest step: reverted first, reapplied last
+            undo_calls, redo_calls = self._undo.pop()
+            self._undo.append(((undo,) + undo_calls, redo_calls + (redo,)))
+        else:
+            self._undo.append(((undo,), (redo,)))
+        self._group = group
+        self._redo.clear()
+
+    def can_undo(self):
+        return bool(self._undo)
+
+    def can_redo(self):
+        return bool(self._redo)
+
+    def pop_undo(self):
+        """Move the newest step to the redo stack; returns its revert calls"""
+        step = self._undo.pop()
+        self._redo.append(step)
+        self._group = None
+        return step[0]
+
+    def pop_redo(self):
+        """Move the newest undone step back; returns its reapply calls"""
+        step = self._redo.pop()
+        self._undo.append(step)
+        self._group = None
+        return step[1]
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+        self._group = None
+
+    def __len__(self):
+        return len(self._undo)
@@ -0,0 +1,34 @@
+from functools import lru_cache
+
+# Characters with a special meaning in LaTeX and their literal forms. `~` is
+# deliberately left alone: users type it for a non-breaking space.
+LATEX_SPECIAL_CHARS = {
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "^": r"\textasciicircum{}"
+}
+
+_ESCAPE_TABLE = str.maketrans(LATEX_SPECIAL_CHARS)
+
+
+@lru_cache(maxsize=65536)
+def _escape_str(text):
+    return text.translate(_ESCAPE_TABLE)
+
+
+def escape_latex(value):
+    """Return value with LaTeX special characters escaped, cached per distinct value"""
+    if value.__class__ is not str:
+        value = "" if value is None else str(value)
+    return _escape_str(value)
+
+
+def escape_fields(fields):
+    """Escape every value of a field dict (e.g. personal info)"""
+    return {key: escape_latex(value) for key, value in fields.items()}
@@ -0,0 +1,49 @@
+import re
+from collections import deque
+
+# "[3" opening a shipped-page marker, e.g. "[1] [2]" or "[3{/path/to/font.map}]"
+PAGE_MARKER = re.compile(r"(?:^|[\s\]])\[(\d+)(?=[\]\s{<]|$)")
+# Line number context TeX prints after an error, e.g. "l.42 \cventry{..."
+ERROR_CONTEXT = re.compile(r"^l\.\d+")
+
+
+class LatexLogParser:
+    """Incremental parser for XeLaTeX terminal output, fed one line at a time.
+
+    Tracks shipped pages for progress reporting and collects `!` error
+    excerpts, while only keeping a bounded tail of the raw output in memory.
+    """
+
+    def __init__(self, on_page=None, max_errors=10, error_lines=6, tail_lines=30):
+        self.on_page = on_page
+        self.pages = 0
+        self.errors = []
+        self.max_errors = max_errors
+        self.error_lines = error_lines
+        self.tail = deque(maxlen=tail_lines)
+        self._current_error = None
+
+    def feed(self, line):
+        line = line.rstrip("\r\n")
+        self.tail.append(line)
+
+        if self._current_error is not None:
+            self._current_error.append(line)
+            if ERROR_CONTEXT.match(line) or len(self._current_error) >= self.error_lines:
+                self._current_error = None
+        elif line.startswith("!") and len(self.errors) < self.max_errors:
+            self._current_error = [line]
+            self.errors.append(self._current_error)
+
+        for match in PAGE_MARKER.finditer(line):
+            # Only consecutive numbers count; other bracketed numbers are noise
+            if int(match.group(1)) == self.pages + 1:
+                self.pages += 1
+                if self.on_page:
+                    self.on_page(self.pages)
+
+    def error_excerpt(self):
+        """The `!` errors with their context, or the last lines of output if there were none"""
+        if self.errors:
+            return "\n\n".join("\n".join(error) for error in self.errors)
+        return "\n".join(self.tail)
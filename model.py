@@ -1,15 +1,28 @@
 import os
-import json
-import tempfile
-import subprocess
-from pathlib import Path
-from jinja2 import Template
+from pdf_cache import PDFCache
+from engines import XeLaTeXEngine
+from fonts import resolve_font
+from compile_runner import CompileRunner
+from template_engine import template_cache, TemplateFieldError
+from sections import SECTION_REGISTRY, RENDER_ORDER, section_records
+from latex_escape import escape_fields
+from history import History
+
+# Modules only needed to compile or save (json, tempfile, jinja2, subprocess,
+# pathlib, the build directory and format helpers) are imported where used,
+# so opening the editor does not pay for them; see test_startup_budget.
 
 # Default template path
-TEMPLATE_PATH = Path(__file__).parent / "templates" / "cv_template.tex"
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "cv_template.tex")
+
+# Per-user cache root for compiled artifacts
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")), "pycurriculum")
+
+# The summary is free text and commonly carries LaTeX markup, so it is raw by default
+DEFAULT_RAW_LATEX_SECTIONS = {"summary"}
 
 class CVModel:
-    def __init__(self):
+    def __init__(self, engine=None):
         self.personal_info = {
             "name_first": "John",
             "name_last": "Doe",
@@ -89,282 +102,486 @@ class CVModel:
             "publications": True,
             "languages": True
         }
+        
+        # Section types registered beyond the built-in ones start out empty;
+        # list entries are kept as typed records (see records.py)
+        for key, section in SECTION_REGISTRY.items():
+            self.sections[key] = section.to_records(self.sections.get(key, "" if section.fields is None else []))
+            self.section_visibility.setdefault(key, True)
+        
+        # Sections (or "personal") whose fields are inserted as raw LaTeX
+        # instead of being escaped; see set_raw_latex()
+        self.raw_latex_sections = set(DEFAULT_RAW_LATEX_SECTIONS)
+        
+        # "json" or "binary" (see project_format.py); loading a project keeps its format
+        self.project_format = "json"
+        
+        # Compiled PDFs keyed by content; set to None to always recompile
+        self.pdf_cache = PDFCache(os.path.join(CACHE_DIR, "pdf"))
+        
+        # Opt-in warm XeLaTeX working directory, see use_build_dir()
+        self.project_path = None
+        self.build_dir = None
+        
+        # Requested main font; replaced by an installed equivalent when missing
+        self.main_font = "Arial"
+        
+        # Runs XeLaTeX with a wall-clock timeout; cpu_seconds/memory_bytes are opt-in
+        self.compile_runner = CompileRunner(timeout=300)
+        self.last_page_count = None
+        
+        # Opt-in precompiled preamble format, see use_preamble_format()
+        self.preamble_format = None
+        
+        # TeX engine behind compile_latex; see engines.FakeEngine for offline use
+        self.engine = engine or XeLaTeXEngine()
+        
+        # Called as listener(operation, *args) after every edit, where
+        # operation is the name of the mutating method; see autosave.py
+        self._listeners = []
+        
+        # Undo/redo steps of the edits above; see undo() and redo()
+        self.history = History()
+        self._applying_history = False
+        
+        # Inverted index behind search_entries(), created on first search
+        self._search_index = None
+        
+        # Rendered LaTeX per section, reused until the section is marked dirty
+        self._fragments = {}
+        self._dirty_sections = set(self.sections) | {"personal"}
+        self._template = None
+        self._template_digest = None
+    
+    def mark_dirty(self, section):
+        """Force the next render to rebuild a single section"""
+        self._dirty_sections.add(section)
+    
+    def mark_all_dirty(self):
+        self._dirty_sections.update(self.sections)
+        self._dirty_sections.add("personal")
+    
+    def add_listener(self, listener):
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener):
+        self._listeners.remove(listener)
+    
+    def _notify(self, operation, *args):
+        for listener in self._listeners:
+            listener(operation, *args)
+    
+    def _record(self, undo, redo, group=None):
+        if not self._applying_history:
+            self.history.record(undo, redo, group)
     
     def update_personal_info(self, key, value):
         if key in self.personal_info:
+            old = self.personal_info[key]
             self.personal_info[key] = value
+            self.mark_dirty("personal")
+            if old != value:
+                self._record(("update_personal_info", (key, old)), ("update_personal_info", (key, value)))
+            self._notify("update_personal_info", key, value)
     
     def update_section(self, section, content):
         if section in self.sections:
+            old = self.sections[section]
             self.sections[section] = content.strip()
+            self.mark_dirty(section)
+            new = self.sections[section]
+            if old != new:
+                self._record(("update_section", (section, old)), ("update_section", (section, new)))
+            self._notify("update_section", section, self.sections[section])
     
     def toggle_section(self, section, visible):
         if section in self.section_visibility:
+            # Hidden sections keep their cached fragment; only inclusion changes
+            old = self.section_visibility[section]
             self.section_visibility[section] = visible
+            if old != visible:
+                self._record(("toggle_section", (section, old)), ("toggle_section", (section, visible)))
+            self._notify("toggle_section", section, visible)
     
-    def load_template(self):
+    def set_raw_latex(self, section, raw):
+        """Insert a section's fields (or "personal" info) verbatim instead of escaped"""
+        old = section in self.raw_latex_sections
+        if raw:
+            self.raw_latex_sections.add(section)
+        else:
+            self.raw_latex_sections.discard(section)
+        self.mark_dirty(section)
+        if old != raw:
+            self._record(("set_raw_latex", (section, old)), ("set_raw_latex", (section, raw)))
+        self._notify("set_raw_latex", section, raw)
+    
+    def add_entry(self, section, entry):
+        entry = SECTION_REGISTRY[section].as_record(entry)
+        self.sections[section].append(entry)
+        self.mark_dirty(section)
+        idx = len(self.sections[section]) - 1
+        self._record(("delete_entry", (section, idx)), ("insert_entry", (section, idx, entry)))
+        self._notify("add_entry", section, entry)
+    
+    def add_entries(self, section, entries, group=None):
+        """Append several entries as one edit; batches passing the same group
+        token are undone together unless other edits come in between"""
+        entries = SECTION_REGISTRY[section].to_records(entries)
+        start = len(self.sections[section])
+        self.sections[section].extend(entries)
+        self.mark_dirty(section)
+        self._record(("delete_entries", (section, start, len(entries))), ("add_entries", (section, entries)), group)
+        self._notify("add_entries", section, entries)
+    
+    def delete_entries(self, section, start, count):
+        old = self.sections[section][start:start + count]
+        del self.sections[section][start:start + count]
+        self.mark_dirty(section)
+        self._record(("add_entries", (section, old)), ("delete_entries", (section, start, count)))
+        self._notify("delete_entries", section, start, count)
+    
+    def insert_entry(self, section, idx, entry):
+        entry = SECTION_REGISTRY[section].as_record(entry)
+        self.sections[section].insert(idx, entry)
+        self.mark_dirty(section)
+        self._record(("delete_entry", (section, idx)), ("insert_entry", (section, idx, entry)))
+        self._notify("insert_entry", section, idx, entry)
+    
+    def edit_entry(self, section, idx, entry):
+        # Entries are replaced, never mutated, so history steps can share them
+        entry = SECTION_REGISTRY[section].as_record(entry)
+        old = self.sections[section][idx]
+        self.sections[section][idx] = entry
+        self.mark_dirty(section)
+        self._record(("edit_entry", (section, idx, old)), ("edit_entry", (section, idx, entry)))
+        self._notify("edit_entry", section, idx, entry)
+    
+    def delete_entry(self, section, idx):
+        old = self.sections[section][idx]
+        del self.sections[section][idx]
+        self.mark_dirty(section)
+        self._record(("insert_entry", (section, idx, old)), ("delete_entry", (section, idx)))
+        self._notify("delete_entry", section, idx)
+    
+    def search_entries(self, section, query):
+        """Positions of the entries of a list section matching every word of query"""
+        if self._search_index is None:
+            from search_index import SearchIndex
+            self._search_index = SearchIndex(self)
+        return self._search_index.search(section, query)
+    
+    def undo(self):
+        """Revert the newest edit; returns the (operation, args) calls applied, or None"""
+        if not self.history.can_undo():
+            return None
+        return self._apply_history(self.history.pop_undo())
+    
+    def redo(self):
+        """Reapply the newest undone edit; returns the (operation, args) calls applied, or None"""
+        if not self.history.can_redo():
+            return None
+        return self._apply_history(self.history.pop_redo())
+    
+    def _apply_history(self, calls):
+        # Goes through the regular mutators so caches and listeners stay in step
+        self._applying_history = True
         try:
-            with open(TEMPLATE_PATH, "r", encoding="utf-8") as f:
-                return f.read()
-        except FileNotFoundError:
-            return self.get_fallback_template()
+            for operation, args in calls:
+                getattr(self, operation)(*args)
+        finally:
+            self._applying_history = False
+        return calls
+    
+    def get_template(self):
+        """Return the compiled template, re-parsed only when the file changes"""
+        compiled = template_cache.get(TEMPLATE_PATH, fallback_source=self.get_fallback_template())
+        if compiled.digest != self._template_digest:
+            # Section wrappers come from the template, so cached fragments are stale
+            self._template_digest = compiled.digest
+            self.mark_all_dirty()
+        self._template = compiled
+        return compiled
+    
+    def load_template(self):
+        return self.get_template().source
     
     def get_fallback_template(self):
-        return r"""\documentclass[11pt,a4paper,sans]{{moderncv}}
-\moderncvstyle{{classic}}
-\moderncvcolor{{blue}}
-\usepackage[scale=0.75]{{geometry}}
-\usepackage[utf8]{{inputenc}}
-\usepackage[T1]{{fontenc}}
-\usepackage[brazil]{{babel}}
-\usepackage{{fontspec}}
-\setmainfont{{Arial}}
+        return r"""\BLOCK{block preamble}
+\documentclass[11pt,a4paper,sans]{moderncv}
+\moderncvstyle{classic}
+\moderncvcolor{blue}
+\usepackage[scale=0.75]{geometry}
+\usepackage[utf8]{inputenc}
+\usepackage[T1]{fontenc}
+\usepackage[brazil]{babel}
+\csname endofdump\endcsname
+\usepackage{fontspec}
+\BLOCK{if main_font}
+\setmainfont{\VAR{main_font}}
+\BLOCK{endif}
+\BLOCK{endblock}
 
-\name{{{name_first}}}{{{name_last}}}
-\title{{{title}}}
-\address{{{address}}}
-\phone{{{phone}}}
-\email{{{email}}}
-\homepage{{{homepage}}}
-\social[linkedin]{{{linkedin}}}
-\social[github]{{{github}}}
+\BLOCK{block header}
+\name{\VAR{name_first}}{\VAR{name_last}}
+\title{\VAR{title}}
+\address{\VAR{address}}
+\phone{\VAR{phone}}
+\email{\VAR{email}}
+\homepage{\VAR{homepage}}
+\social[linkedin]{\VAR{linkedin}}
+\social[github]{\VAR{github}}
+\BLOCK{endblock}
 
-\begin{{document}}
+\begin{document}
 \makecvtitle
-{content}
-\end{{document}}"""
+\VAR{content}
+\end{document}"""
     
     def generate_latex(self):
         """
         Generate LaTeX content from template and user data
         Returns formatted LaTeX document as string
         """
-        # Load the raw template (with escaped braces)
-        template = self.load_template()
+        # Compiled once per template version
+        template = self.get_template()
         
         # Build content from visible sections
         content = self.build_content_sections()
         
-        # Format with named parameters for safety
+        # Render with named parameters for safety
+        personal_info = self.personal_info
+        if "personal" not in self.raw_latex_sections:
+            personal_info = escape_fields(personal_info)
         try:
-            return template.format(content=content, **self.personal_info)
-        except KeyError as e:
+            return template.render(content=content, main_font=resolve_font(self.main_font), **personal_info)
+        except TemplateFieldError as e:
             raise ValueError(f"Missing required personal info field: {e}") from e
 
     def build_content_sections(self):
-        """Construct the LaTeX content for all visible sections"""
-        content = ""
-        section_order = [
-            ("summary", "Summary"),
-            ("education", "Education"),
-            ("research", "Research Projects"),
-            ("experience", "Professional Experience"),
-            ("projects", "Personal Open Source Projects"),
-            ("skills", "Technical Skills"),
-            ("awards", "Awards"),
-            ("publications", "Publications"),
-            ("languages", "Languages")
-        ]
-        
-        for section_key, section_title in section_order:
-            if self.section_visibility.get(section_key, True):
-                content += self.build_section(section_key, section_title)
+        """Construct the LaTeX content for all visible sections.
+
+        Sections are rendered through build_section only when dirty; clean
+        sections reuse the fragment from the previous call. Code that mutates
+        self.sections directly must call mark_dirty() for the change to show.
+        """
+        self.get_template()
+        fragments = []
+        for section_key in RENDER_ORDER:
+            if not self.section_visibility.get(section_key, True):
+                continue
+            if section_key in self._dirty_sections or section_key not in self._fragments:
+                self._fragments[section_key] = self.build_section(section_key, SECTION_REGISTRY[section_key].title)
+                self._dirty_sections.discard(section_key)
+            fragments.append(self._fragments[section_key])
         
-        return content
+        return "".join(fragments)
 
-    def build_section(self, section_key, section_title):
-        """Build individual section with header and content"""
-        if section_key == "education":
-            entries = self.sections["education"]
-            latex = ""
-            for edu in entries:
-                latex += (
-                    rf"\cventry{{{edu['start']}--{edu['end']}}}"
-                    rf"{{{edu['degree']}}}"
-                    rf"{{{edu['institution']}}}"
-                    rf"{{}}"  # Location (optional, left blank)
-                    rf"{{}}"  # Empty field
-                    rf"{{{edu['details']}}}\n"
-                )
-            return rf"""
+    def wrap_section(self, section_title, body):
+        """Wrap a section body with its header using the template's section block"""
+        template = self._template or self.get_template()
+        if template.has_block("section"):
+            return template.render_block("section", section_title=section_title, body=body)
+        return rf"""
 % ======================
 % {section_title.upper()}
 % ======================
 \section{{{section_title}}}
-{latex}
-"""
-        elif section_key == "experience":
-            entries = self.sections["experience"]
-            latex = ""
-            for exp in entries:
-                latex += (
-                    rf"\cventry{{{exp['start']}--{exp['end']}}}"
-                    rf"{{{exp['job_title']}}}"
-                    rf"{{{exp['company']}}}"
-                    rf"{{}}"  # Location (optional, left blank)
-                    rf"{{}}"  # Empty field
-                    rf"{{{exp['details']}}}\n"
-                )
-            return rf"""
-% ======================
-% {section_title.upper()}
-% ======================
-\section{{{section_title}}}
-{latex}
-"""
-        elif section_key == "research":
-            entries = self.sections["research"]
-            latex = ""
-            for res in entries:
-                latex += (
-                    rf"\cventry{{{res['start']}--{res['end']}}}"
-                    rf"{{{res['project_title']}}}"
-                    rf"{{{res['institution']}}}"
-                    rf"{{}}"  # Location (optional, left blank)
-                    rf"{{}}"  # Empty field
-                    rf"{{{res['details']}}}\n"
-                )
-            return rf"""
-% ======================
-% {section_title.upper()}
-% ======================
-\section{{{section_title}}}
-{latex}
-"""
-        elif section_key == "projects":
-            entries = self.sections["projects"]
-            latex = ""
-            for proj in entries:
-                latex += (
-                    rf"\cvitem{{{proj['years']}}}{{\textbf{{{proj['project_name']}}} {proj['description']}}}\n"
-                )
-            return rf"""
-% ======================
-% {section_title.upper()}
-% ======================
-\section{{{section_title}}}
-{latex}
-"""
-        elif section_key == "skills":
-            entries = self.sections["skills"]
-            latex = ""
-            for skill in entries:
-                latex += rf"\cvitem{{{skill['category']}}}{{{skill['items']}}}\n"
-            return rf"""
-% ======================
-% {section_title.upper()}
-% ======================
-\section{{{section_title}}}
-{latex}
-"""
-        elif section_key == "awards":
-            entries = self.sections["awards"]
-            latex = ""
-            for award in entries:
-                latex += rf"\cvitem{{{award['year']}}}{{{award['award_name']} - {award['organization']}}}\n"
-            return rf"""
-% ======================
-% {section_title.upper()}
-% ======================
-\section{{{section_title}}}
-{latex}
-"""
-        elif section_key == "publications":
-            entries = self.sections["publications"]
-            latex = ""
-            for pub in entries:
-                latex += rf"\cvitem{{{pub['year']}}}{{{pub['authors']}. \"{pub['title']}\". {pub['venue']}, {pub['year']}.}}\n"
-            return rf"""
-% ======================
-% {section_title.upper()}
-% ======================
-\section{{{section_title}}}
-{latex}
-"""
-        elif section_key == "languages":
-            entries = self.sections["languages"]
-            latex = ""
-            for lang in entries:
-                latex += rf"\cvitem{{{lang['language']}}}{{{lang['proficiency']}}}\n"
-            return rf"""
-% ======================
-% {section_title.upper()}
-% ======================
-\section{{{section_title}}}
-{latex}
-"""
-        else:
-            return rf"""
-% ======================
-% {section_title.upper()}
-% ======================
-\section{{{section_title}}}
-{self.sections[section_key]}
+{body}
 """
 
-    def compile_latex(self, latex_content, callback):
-        """Compile LaTeX content to PDF and call callback with result"""
+    def build_section(self, section_key, section_title):
+        """Build individual section with header and content"""
+        renderer = SECTION_REGISTRY.get(section_key)
+        raw = section_key in self.raw_latex_sections
+        if renderer is None:
+            return self.wrap_section(section_title, self.sections[section_key])
+        if renderer.fields is None:
+            return self.wrap_section(section_title, renderer.render_text(self.sections[section_key], raw))
+        return self.wrap_section(section_title, renderer.render_entries(self.sections[section_key], raw))
+    
+    def use_build_dir(self, enabled=True, max_bytes=50 * 1024 * 1024, root=None):
+        """Opt in to a persistent per-project XeLaTeX build directory under root"""
+        if self.build_dir is not None:
+            with self.build_dir.lock:
+                self.build_dir.clean()
+        self.build_dir = None
+        if enabled:
+            from build_dir import BuildDirectory
+            self.build_dir = BuildDirectory(root or os.path.join(CACHE_DIR, "build"), self.project_path, max_bytes)
+    
+    def use_preamble_format(self, enabled=True):
+        """Opt in to compiling against a dumped format of the static preamble"""
+        self.preamble_format = None
+        if enabled and self.engine.supports_formats:
+            from preamble_format import PreambleFormat
+            self.preamble_format = PreambleFormat(os.path.join(CACHE_DIR, "formats"), self.engine.executable)
+    
+    def set_project_path(self, file_path):
+        """Track the current project file, dropping the previous project's build state"""
+        if file_path == self.project_path:
+            return
+        self.project_path = file_path
+        if self.build_dir is not None:
+            self.use_build_dir(True, self.build_dir.max_bytes, self.build_dir.root)
+    
+    def compile_latex(self, latex_content, callback, cancel_event=None, progress=None):
+        """Compile LaTeX content to PDF and call callback with result.
+
+        Setting cancel_event (a threading.Event) kills a running XeLaTeX
+        process and reports the compile as cancelled. progress, if given, is
+        called as progress(pages_done, pages_expected) whenever XeLaTeX ships
+        a page; pages_expected is the page count of the previous compile, or
+        None before the first one.
+        """
         try:
-            with tempfile.TemporaryDirectory() as tmpdir:
-                tex_path = os.path.join(tmpdir, "cv.tex")
-                pdf_path = os.path.join(tmpdir, "cv.pdf")
-                
-                # Write LaTeX file
-                with open(tex_path, "w", encoding="utf-8") as f:
-                    f.write(latex_content)
-                
-                # Compile with XeLaTeX
-                result = subprocess.run(
-                    ["xelatex", "-interaction=nonstopmode", "-output-directory", tmpdir, tex_path],
-                    capture_output=True,
-                    text=True
-                )
-                
-                # Check result
-                if os.path.exists(pdf_path):
-                    callback(True, pdf_path, "PDF generated successfully")
-                else:
-                    error_msg = "PDF generation failed.\n\nLaTeX Output:\n"
-                    error_msg += result.stdout[:1000] + "\n\nErrors:\n" + result.stderr[:1000]
-                    callback(False, None, error_msg)
+            cache_key = None
+            if self.pdf_cache is not None:
+                cache_key = self.pdf_cache.make_key(latex_content, self.engine.version())
+                cached_pdf = self.pdf_cache.get(cache_key)
+                if cached_pdf:
+                    callback(True, cached_pdf, "PDF loaded from cache")
+                    return
+            
+            build_dir = self.build_dir
+            if build_dir is not None:
+                with build_dir.lock:
+                    workdir = build_dir.prepare()
+                    success, pdf_path, message = self.run_xelatex(latex_content, workdir, cache_key, cancel_event, progress)
+                    if success and cache_key is None:
+                        pdf_path = build_dir.publish(pdf_path)
+                callback(success, pdf_path, message)
+            else:
+                import tempfile
+                with tempfile.TemporaryDirectory() as tmpdir:
+                    # The temp PDF only lives until the directory is removed
+                    callback(*self.run_xelatex(latex_content, tmpdir, cache_key, cancel_event, progress))
         except Exception as e:
             callback(False, None, f"Compilation error: {str(e)}")
     
-    def save_project(self, file_path):
-        """Save project data to JSON file"""
+    def ensure_preamble_format(self, latex_content):
+        """Return the format name for the document's preamble, or None to compile normally"""
+        if self.preamble_format is None:
+            return None
+        # Taken from the document rather than the template, which the Tk
+        # thread may be re-reading while this runs on the compile worker
+        from preamble_format import DUMP_MARKER
+        preamble, marker, _ = latex_content.partition("\\begin{document}")
+        if not marker or DUMP_MARKER not in preamble:
+            return None
+        return self.preamble_format.ensure(preamble)
+    
+    def run_xelatex(self, latex_content, workdir, cache_key=None, cancel_event=None, progress=None):
+        """Run the TeX engine in workdir and return (success, pdf_path, message)"""
+        tex_path = os.path.join(workdir, "cv.tex")
+        pdf_path = os.path.join(workdir, "cv.pdf")
+        
+        # A PDF left over from a previous run in a reused directory is not a result
+        if os.path.exists(pdf_path):
+            os.remove(pdf_path)
+        
+        # Write LaTeX file
+        with open(tex_path, "w", encoding="utf-8") as f:
+            f.write(latex_content)
+        
+        # Compile with the engine, against the precompiled preamble when available
+        format_args = []
+        env = dict(os.environ)
+        format_name = self.ensure_preamble_format(latex_content)
+        if format_name:
+            format_args = self.preamble_format.command_args(format_name)
+            env = self.preamble_format.environment()
+        # Unwrapped output lines keep page markers and error messages intact
+        env["max_print_line"] = "10000"
+        
+        expected_pages = self.last_page_count
+        on_page = (lambda pages: progress(pages, expected_pages)) if progress else None
+        from latex_log import LatexLogParser
+        log = LatexLogParser(on_page=on_page)
+        result = self.compile_runner.run(
+            self.engine.command(tex_path, workdir, format_args),
+            env=env,
+            cancel_event=cancel_event,
+            on_line=log.feed,
+            log_path=os.path.join(workdir, "cv.output.log")
+        )
+        if result.stopped:
+            # A killed run may leave a partial PDF behind; never report it
+            return False, None, self.compile_runner.describe(result)
+        
+        # Check result
+        if os.path.exists(pdf_path):
+            self.last_page_count = log.pages or self.last_page_count
+            if cache_key is not None:
+                try:
+                    pdf_path = self.pdf_cache.put(cache_key, pdf_path)
+                except OSError:
+                    pass  # Cache is best effort; the build PDF is still valid here
+            return True, pdf_path, "PDF generated successfully"
+        error_msg = "PDF generation failed.\n\n"
+        error_msg += "LaTeX Errors:\n" if log.errors else "LaTeX Output (last lines):\n"
+        error_msg += log.error_excerpt()
+        return False, None, error_msg
+    
+    def save_project(self, file_path, project_format=None):
+        """Save project data as JSON or, with project_format="binary", in the compact format"""
+        from project_format import write_binary_project, write_json_project
+        project_format = project_format or self.project_format
         try:
-            data = {
-                "personal": self.personal_info,
-                "sections": self.sections,
-                "visibility": self.section_visibility
-            }
-            with open(file_path, "w") as f:
-                json.dump(data, f, indent=2)
+            data = self.project_data()
+            if project_format == "binary":
+                write_binary_project(file_path, data)
+            else:
+                write_json_project(file_path, data)
+            self.project_format = project_format
+            self.set_project_path(file_path)
             return True, f"Project saved: {os.path.basename(file_path)}"
         except Exception as e:
             return False, f"Save failed: {str(e)}"
     
+    def project_data(self):
+        """Everything a project file stores, as one dict"""
+        return {
+            "personal": self.personal_info,
+            "sections": self.sections,
+            "visibility": self.section_visibility,
+            "raw_latex": sorted(self.raw_latex_sections)
+        }
+    
     def load_project(self, file_path):
-        """Load project data from JSON file"""
+        """Load project data from a JSON or compact project file"""
+        from project_format import read_project
         try:
-            with open(file_path, "r") as f:
-                data = json.load(f)
-            
-            # Update personal info
-            for key, value in data.get("personal", {}).items():
-                if key in self.personal_info:
-                    self.personal_info[key] = value
-            
-            # Update sections
-            for key, value in data.get("sections", {}).items():
-                if key in self.sections:
-                    self.sections[key] = value
-            
-            # Update visibility
-            for key, value in data.get("visibility", {}).items():
-                if key in self.section_visibility:
-                    self.section_visibility[key] = value
-            
+            data, self.project_format = read_project(file_path)
+            self.load_project_data(data)
+            self.set_project_path(file_path)
             return True, "Project loaded successfully"
         except Exception as e:
-            return False, f"Load failed: {str(e)}"
\ No newline at end of file
+            return False, f"Load failed: {str(e)}"
+    
+    def load_project_data(self, data):
+        """Replace the model's content with data as returned by project_data()"""
+        from project_format import LazySections
+        self.mark_all_dirty()
+        self.history.clear()
+        
+        # Update personal info
+        for key, value in data.get("personal", {}).items():
+            if key in self.personal_info:
+                self.personal_info[key] = value
+        
+        # Update sections; each is decoded (compact projects) and turned
+        # into entry records on first access
+        sections = data.get("sections", {})
+        if not isinstance(sections, LazySections):
+            sections = LazySections.from_values(sections)
+        self.sections = sections.with_defaults(self.sections, convert=section_records)
+        
+        # Projects saved before escaping existed keep the default raw sections
+        self.raw_latex_sections = set(data.get("raw_latex", DEFAULT_RAW_LATEX_SECTIONS))
+        
+        # Update visibility
+        for key, value in data.get("visibility", {}).items():
+            if key in self.section_visibility:
+                self.section_visibility[key] = value
+        
+        self._notify("load_project_data")
@@ -0,0 +1,115 @@
+import os
+import threading
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def engine_version(command="xelatex"):
+    """Return the first line of `<command> --version`, probed once per process"""
+    import subprocess
+    try:
+        result = subprocess.run([command, "--version"], capture_output=True, text=True)
+        lines = result.stdout.strip().splitlines()
+        return lines[0] if lines else "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unavailable"
+
+
+class PDFCache:
+    """Content-addressed on-disk cache of compiled PDFs with LRU eviction.
+
+    Entries are stored as `<sha256>.pdf` files; the file mtime doubles as the
+    last-used timestamp, so recency survives restarts without an index file.
+    """
+
+    def __init__(self, cache_dir, max_bytes=200 * 1024 * 1024):
+        self.cache_dir = str(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def make_key(self, latex_content, engine):
+        """Hash the generated LaTeX (which includes all the template puts out) and the engine version"""
+        import hashlib
+        digest = hashlib.sha256()
+        for part in (latex_content, engine):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def get(self, key):
+        """Return the cached PDF path for key, or None on a miss"""
+        path = self.path_for(key)
+        with self._lock:
+            try:
+                os.utime(path)  # Mark as most recently used
+            except OSError:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return path
+
+    def put(self, key, pdf_path):
+        """Store a compiled PDF under key and return its cached path"""
+        import shutil
+        os.makedirs(self.cache_dir, exist_ok=True)
+        target = self.path_for(key)
+        tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(pdf_path, tmp_path)
+        os.replace(tmp_path, target)
+        self.evict(keep=target)
+        return target
+
+    def entries(self):
+        """List (path, size, mtime) for every cached PDF"""
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return []
+        entries = []
+        for name in names:
+            if not name.endswith(".pdf"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def evict(self, keep=None):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        with self._lock:
+            entries = sorted(self.entries(), key=lambda e: e[2])
+            total = sum(size for _, size, _ in entries)
+            for path, size, _ in entries:
+                if total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+
+    def clear(self):
+        for path, _, _ in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        entries = self.entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries)
+        }
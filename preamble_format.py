@@ -0,0 +1,158 @@
+import os
+import glob
+import time
+import shutil
+import tempfile
+import hashlib
+import threading
+import subprocess
+from contextlib import contextmanager
+from functools import lru_cache
+from pdf_cache import engine_version
+
+try:
+    import fcntl
+except ImportError:  # Windows: dumps are only serialised within this process
+    fcntl = None
+
+FORMAT_PREFIX = "cvpreamble"
+
+# mylatexformat stops dumping here; what follows is processed on every run
+DUMP_MARKER = r"\csname endofdump\endcsname"
+
+# Other formats are removed after a new one is dumped only once they have
+# not been used for this long, so processes compiling other preambles (or
+# on another TeX installation) keep theirs
+STALE_FORMAT_SECONDS = 24 * 60 * 60
+
+
+@lru_cache(maxsize=None)
+def installation_stamp(engine="xelatex"):
+    """Identify the TeX installation by the location and mtime of the engine's base format.
+
+    fmtutil rebuilds xelatex.fmt whenever packages are updated, so a new
+    stamp means any format dumped on top of it is stale.
+    """
+    try:
+        result = subprocess.run(
+            ["kpsewhich", f"-progname={engine}", f"{engine}.fmt"],
+            capture_output=True,
+            text=True
+        )
+        fmt_path = result.stdout.strip()
+        if fmt_path:
+            return f"{fmt_path}:{os.stat(fmt_path).st_mtime_ns}"
+    except (OSError, subprocess.SubprocessError):
+        pass
+    return "unknown"
+
+
+class PreambleFormat:
+    """Precompiled XeLaTeX format holding the template's static preamble.
+
+    The preamble is dumped with mylatexformat up to `\\endofdump`; anything
+    after that marker (fontspec and font selection, which XeTeX cannot store
+    in a format) is still processed on every run. Documents compiled with the
+    format skip the dumped part of their own preamble.
+    """
+
+    def __init__(self, format_dir, engine="xelatex"):
+        self.format_dir = os.path.abspath(str(format_dir))
+        self.engine = engine
+        self._failed = set()
+        self._lock = threading.Lock()
+
+    def format_name(self, preamble):
+        # Only the dumped part goes into the format, so e.g. a new main font reuses it
+        dumped = preamble.split(DUMP_MARKER, 1)[0]
+        digest = hashlib.sha256()
+        for part in (dumped, engine_version(self.engine), installation_stamp(self.engine)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return f"{FORMAT_PREFIX}-{digest.hexdigest()[:16]}"
+
+    def ensure(self, preamble):
+        """Return the format name for preamble, dumping it first if needed.
+
+        Returns None when the format cannot be built so callers fall back to a
+        regular compile; a failing preamble is not retried in this process.
+        """
+        name = self.format_name(preamble)
+        fmt_path = os.path.join(self.format_dir, f"{name}.fmt")
+        if self._touch(fmt_path):
+            return name
+        with self._dump_lock():
+            if self._touch(fmt_path):
+                return name
+            if name in self._failed:
+                return None
+            if self._dump(name, preamble):
+                self._remove_stale(keep=name)
+                return name
+            self._failed.add(name)
+            return None
+
+    @contextmanager
+    def _dump_lock(self):
+        # Serialises dumping and clean-up between threads and processes sharing format_dir
+        os.makedirs(self.format_dir, exist_ok=True)
+        with self._lock, open(os.path.join(self.format_dir, f"{FORMAT_PREFIX}.lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _touch(self, fmt_path):
+        # Marks an existing format as in use, which protects it from _remove_stale()
+        try:
+            os.utime(fmt_path)
+            return True
+        except FileNotFoundError:
+            return False
+        except OSError:
+            return os.path.exists(fmt_path)
+
+    def _dump(self, name, preamble):
+        os.makedirs(self.format_dir, exist_ok=True)
+        # Dump in a private directory so concurrent processes never see a partial .fmt
+        workdir = tempfile.mkdtemp(prefix=f"{name}-", dir=self.format_dir)
+        try:
+            with open(os.path.join(workdir, f"{name}.tex"), "w", encoding="utf-8") as f:
+                f.write(preamble)
+                f.write("\n\\begin{document}\n\\end{document}\n")
+            subprocess.run(
+                [self.engine, "-ini", "-interaction=nonstopmode", f"-jobname={name}",
+                 f"&{self.engine}", "mylatexformat.ltx", f"{name}.tex"],
+                cwd=workdir,
+                capture_output=True,
+                text=True
+            )
+            built = os.path.join(workdir, f"{name}.fmt")
+            if not os.path.exists(built):
+                return False
+            os.replace(built, os.path.join(self.format_dir, f"{name}.fmt"))
+            return True
+        except (OSError, subprocess.SubprocessError):
+            return False
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def _remove_stale(self, keep):
+        cutoff = time.time() - STALE_FORMAT_SECONDS
+        for path in glob.glob(os.path.join(self.format_dir, f"{FORMAT_PREFIX}-*.fmt")):
+            if os.path.basename(path).startswith(keep):
+                continue
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def command_args(self, name):
+        return [f"-fmt={name}"]
+
+    def environment(self):
+        """Process environment that lets kpathsea find formats in format_dir"""
+        env = dict(os.environ)
+        # A trailing separator keeps the installation's default format path
+        env["TEXFORMATS"] = self.format_dir + os.pathsep + env.get("TEXFORMATS", "")
+        return env
@@ -0,0 +1,38 @@
+import os
+
+# Milliseconds without edits before the live preview recompiles
+PREVIEW_DEBOUNCE_MS = 800
+
+# Resolution of preview page images; an A4 page is ~460x650 px at 55 dpi
+PREVIEW_DPI = 55
+
+
+def rasterizer_available():
+    import shutil
+    return shutil.which("pdftoppm") is not None
+
+
+def render_pdf_pages(pdf_path, dpi=PREVIEW_DPI, max_pages=10):
+    """Rasterize PDF pages with pdftoppm (poppler).
+
+    Returns a list of base64-encoded PNGs, ready for tk.PhotoImage(data=...),
+    or None when pdftoppm is not installed. Safe to call off the Tk thread.
+    """
+    if not rasterizer_available():
+        return None
+    import glob
+    import base64
+    import tempfile
+    import subprocess
+    with tempfile.TemporaryDirectory() as tmpdir:
+        prefix = os.path.join(tmpdir, "page")
+        subprocess.run(
+            ["pdftoppm", "-png", "-r", str(dpi), "-l", str(max_pages), pdf_path, prefix],
+            capture_output=True
+        )
+        pages = []
+        # pdftoppm zero-pads page numbers to the page count's width, so names sort correctly
+        for path in sorted(glob.glob(prefix + "*.png")):
+            with open(path, "rb") as f:
+                pages.append(base64.b64encode(f.read()).decode("ascii"))
+        return pages
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Compact binary project format
+
+Usage:
+    python project_format.py old.cvproj new.cvproj           # convert to the compact format
+    python project_format.py --json new.cvproj old.cvproj    # convert back to JSON
+
+Layout (little endian):
+    magic b"CVPROJ", format version (uint8), record count (uint32)
+    per record: name length (uint16), UTF-8 name, payload length (uint32)
+    payloads, in record order: zlib-compressed compact JSON
+
+Records are "personal", "visibility", "raw_latex", any other top-level
+values (e.g. the autosave journal position) and one "section:<key>" per CV
+section, so a section can be decoded without touching the others.
+Both the compact format and the older pretty-printed JSON use the .cvproj
+extension; read_project() tells them apart by the magic bytes.
+"""
+
+import os
+import sys
+import json
+import zlib
+import struct
+import argparse
+from collections.abc import MutableMapping
+from records import plain_value, plain_sections
+
+MAGIC = b"CVPROJ"
+FORMAT_VERSION = 1
+SECTION_PREFIX = "section:"
+
+_HEADER = struct.Struct("<6sBI")
+_NAME_LENGTH = struct.Struct("<H")
+_PAYLOAD_LENGTH = struct.Struct("<I")
+
+
+def encode_value(value, level=6):
+    text = json.dumps(plain_value(value), separators=(",", ":"), ensure_ascii=False)
+    return zlib.compress(text.encode("utf-8"), level)
+
+
+def decode_value(payload):
+    return json.loads(zlib.decompress(payload).decode("utf-8"))
+
+
+class _Encoded:
+    """A section payload that has not been decoded yet"""
+
+    __slots__ = ("payload",)
+
+    def __init__(self, payload):
+        self.payload = payload
+
+
+class _Unconverted:
+    """A section value read from JSON that convert() has not seen yet"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class LazySections(MutableMapping):
+    """Section mapping whose values are decompressed and parsed on first access.
+
+    Values that were never accessed keep their compressed payload, so saving
+    an opened project only re-encodes the sections that may have changed.
+    convert(key, value), if given, turns a decoded value into what callers
+    should see (e.g. entry records).
+    """
+
+    def __init__(self, payloads=None, convert=None):
+        self._data = {key: _Encoded(payload) for key, payload in (payloads or {}).items()}
+        self.convert = convert
+
+    @classmethod
+    def from_values(cls, values, convert=None):
+        """Mapping over already decoded values (e.g. a JSON project) that are converted on first access"""
+        sections = cls(convert=convert)
+        sections._data = {key: _Unconverted(value) for key, value in values.items()}
+        return sections
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        cls = value.__class__
+        if cls is _Encoded or cls is _Unconverted:
+            value = decode_value(value.payload) if cls is _Encoded else value.value
+            if self.convert is not None:
+                value = self.convert(key, value)
+            self._data[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __repr__(self):
+        return f"LazySections({list(self._data)!r}, decoded={sorted(self.decoded())!r})"
+
+    def decoded(self):
+        """Keys whose values have been decoded (or assigned)"""
+        return {key for key, value in self._data.items()
+                if value.__class__ is not _Encoded and value.__class__ is not _Unconverted}
+
+    def payload(self, key):
+        """Compressed payload for key, reusing the stored bytes when the value was never decoded"""
+        value = self._data[key]
+        if value.__class__ is _Encoded:
+            return value.payload
+        if value.__class__ is _Unconverted:
+            return encode_value(value.value)
+        return encode_value(value)
+
+    def with_defaults(self, defaults, convert=None):
+        """New mapping with exactly the keys of defaults, taking values (still encoded) from self"""
+        merged = LazySections(convert=convert or self.convert)
+        # Stored values of a lazy defaults mapping, so filling in defaults decodes nothing
+        raw_defaults = defaults._data if isinstance(defaults, LazySections) else defaults
+        for key in raw_defaults:
+            merged._data[key] = self._data[key] if key in self._data else raw_defaults[key]
+        return merged
+
+
+def is_binary_project(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def write_binary_project(path, data):
+    """Write project data (personal, sections, visibility, raw_latex) in the compact format"""
+    sections = data.get("sections", {})
+    records = [(name, encode_value(value)) for name, value in data.items() if name != "sections"]
+    for key in sections:
+        payload = sections.payload(key) if isinstance(sections, LazySections) else encode_value(sections[key])
+        records.append((SECTION_PREFIX + key, payload))
+
+    parts = [_HEADER.pack(MAGIC, FORMAT_VERSION, len(records))]
+    for name, payload in records:
+        encoded_name = name.encode("utf-8")
+        parts.append(_NAME_LENGTH.pack(len(encoded_name)) + encoded_name + _PAYLOAD_LENGTH.pack(len(payload)))
+    parts.extend(payload for _, payload in records)
+
+    # Write next to the target and swap it in, so a failed save keeps the old file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(parts))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def read_binary_project(path):
+    """Read a compact project; sections come back as a LazySections mapping"""
+    with open(path, "rb") as f:
+        blob = f.read()
+    view = memoryview(blob)
+    magic, version, count = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a compact CV project file")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Project format version {version} is newer than this editor supports ({FORMAT_VERSION})")
+
+    offset = _HEADER.size
+    table = []
+    for _ in range(count):
+        (name_length,) = _NAME_LENGTH.unpack_from(view, offset)
+        offset += _NAME_LENGTH.size
+        name = bytes(view[offset:offset + name_length]).decode("utf-8")
+        offset += name_length
+        (payload_length,) = _PAYLOAD_LENGTH.unpack_from(view, offset)
+        offset += _PAYLOAD_LENGTH.size
+        table.append((name, payload_length))
+
+    data = {}
+    payloads = {}
+    for name, payload_length in table:
+        payload = view[offset:offset + payload_length]
+        if len(payload) != payload_length:
+            raise ValueError("Truncated project file")
+        offset += payload_length
+        if name.startswith(SECTION_PREFIX):
+            payloads[name[len(SECTION_PREFIX):]] = payload
+        else:
+            data[name] = decode_value(payload)
+    data["sections"] = LazySections(payloads)
+    return data
+
+
+def read_project(path):
+    """Read a project in either format; returns (data, format) with format "binary" or "json" """
+    if is_binary_project(path):
+        return read_binary_project(path), "binary"
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f), "json"
+
+
+def write_json_project(path, data):
+    data = dict(data, sections=plain_sections(data.get("sections", {})))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+def convert_project(source, target, to_format="binary"):
+    """Rewrite a project file in to_format ("binary" or "json")"""
+    data, _ = read_project(source)
+    if to_format == "binary":
+        write_binary_project(target, data)
+    else:
+        write_json_project(target, data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert CV project files between JSON and the compact format")
+    parser.add_argument("source", help="Project file to read (either format)")
+    parser.add_argument("target", help="Project file to write")
+    parser.add_argument("--json", action="store_true", help="Write pretty-printed JSON instead")
+    args = parser.parse_args(argv)
+
+    try:
+        convert_project(args.source, args.target, "json" if args.json else "binary")
+    except (OSError, ValueError, zlib.error) as e:
+        print(f"Conversion failed: {e}", file=sys.stderr)
+        return 1
+    print(f"{args.source} -> {args.target} ({os.path.getsize(args.source)} -> {os.path.getsize(args.target)} bytes)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+import keyword
+
+
+class Record:
+    """Entry of a list section with one slot per field; unknown keys are kept in `_extra`"""
+
+    __slots__ = ("_extra",)
+    FIELDS = ()
+
+    def __init__(self, **extra):
+        self._extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def to_dict(self):
+        return dict(self._extra) if self._extra else {}
+
+    def get(self, field, default=None):
+        """Field value by name, like dict.get"""
+        if field in self.FIELDS:
+            return getattr(self, field)
+        return self._extra.get(field, default) if self._extra else default
+
+    def replace(self, **changes):
+        """Copy of the record with some fields changed"""
+        return self.__class__(**dict(self.to_dict(), **changes))
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({', '.join(f'{k}={v!r}' for k, v in self.to_dict().items())})"
+
+
+def make_record_type(name, fields):
+    """Record subclass called name with one slot per field and generated __init__ and to_dict"""
+    fields = tuple(fields)
+    for field in fields:
+        if not field.isidentifier() or keyword.iskeyword(field) or field.startswith("_") or hasattr(Record, field):
+            raise ValueError(f"Invalid record field name: {field!r}")
+    source = (
+        "def __init__(self, " + "".join(f'{field}="", ' for field in fields) + "**extra):\n"
+        + "".join(f"    self.{field} = {field}\n" for field in fields)
+        + "    self._extra = extra or None\n"
+        + "def to_dict(self):\n"
+        + "    data = {" + ", ".join(f'"{field}": self.{field}' for field in fields) + "}\n"
+        + "    if self._extra:\n"
+        + "        data.update(self._extra)\n"
+        + "    return data\n"
+    )
+    namespace = {}
+    exec(compile(source, f"<record {name}>", "exec"), namespace)
+    return type(name, (Record,), {"__slots__": fields, "FIELDS": fields,
+                                  "__init__": namespace["__init__"], "to_dict": namespace["to_dict"]})
+
+
+def json_default(value):
+    """`default` hook for json.dump(s) that writes records in the dict layout"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+def plain_value(value):
+    """Section value with records turned into dicts"""
+    if value.__class__ is list:
+        return [entry.to_dict() if isinstance(entry, Record) else entry for entry in value]
+    return value
+
+
+def plain_sections(sections):
+    """Copy of a sections mapping in the project file layout, for json.dump"""
+    return {key: plain_value(value) for key, value in sections.items()}
@@ -0,0 +1,135 @@
+import re
+import unicodedata
+from bisect import bisect_left
+import itertools
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Lower-cased words of text with accents removed, so "Lütz" finds "lutzen" """
+    text = str(text).casefold()
+    if not text.isascii():
+        text = "".join(char for char in unicodedata.normalize("NFKD", text) if not unicodedata.combining(char))
+    return _TOKEN.findall(text)
+
+
+class SectionIndex:
+    """Inverted index over the field values of one list section.
+
+    Each entry gets a stable id; `_ids` maps positions to ids and each token
+    maps to the set of ids whose fields contain it. Adding, editing or
+    deleting an entry only touches that entry's tokens. A query is answered
+    by intersecting the posting sets of its words, each used as a prefix.
+    """
+
+    def __init__(self, entries=()):
+        self._next_id = itertools.count()
+        self._ids = []
+        self._postings = {}
+        self._tokens = {}  # id -> tokens of that entry
+        self._vocabulary = None  # Sorted tokens for prefix lookups, rebuilt when stale
+        self.insert(0, entries)
+
+    def _add(self, entry):
+        entry_id = next(self._next_id)
+        tokens = set()
+        for value in (entry.to_dict() if hasattr(entry, "to_dict") else entry).values():
+            tokens.update(tokenize(value))
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = set()
+                self._vocabulary = None
+            posting.add(entry_id)
+        self._tokens[entry_id] = tokens
+        return entry_id
+
+    def _remove(self, entry_id):
+        for token in self._tokens.pop(entry_id):
+            posting = self._postings[token]
+            posting.discard(entry_id)
+            if not posting:
+                del self._postings[token]
+                self._vocabulary = None
+
+    def insert(self, position, entries):
+        self._ids[position:position] = [self._add(entry) for entry in entries]
+
+    def replace(self, position, entry):
+        self._remove(self._ids[position])
+        self._ids[position] = self._add(entry)
+
+    def delete(self, position, count=1):
+        for entry_id in self._ids[position:position + count]:
+            self._remove(entry_id)
+        del self._ids[position:position + count]
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _matching(self, prefix):
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        vocabulary = self._vocabulary
+        matched = set()
+        i = bisect_left(vocabulary, prefix)
+        while i < len(vocabulary) and vocabulary[i].startswith(prefix):
+            matched |= self._postings[vocabulary[i]]
+            i += 1
+        return matched
+
+    def search(self, query):
+        """Positions of the entries containing every word of query (as a prefix), in order"""
+        words = tokenize(query)
+        if not words:
+            return list(range(len(self._ids)))
+        # Rarest-looking (longest) words first keeps the intersection small
+        matched = None
+        for word in sorted(set(words), key=len, reverse=True):
+            ids = self._matching(word)
+            matched = ids if matched is None else matched & ids
+            if not matched:
+                return []
+        return [position for position, entry_id in enumerate(self._ids) if entry_id in matched]
+
+
+class SearchIndex:
+    """SectionIndex per list section of a model, kept current through its listeners.
+
+    A section is indexed on its first search; after that every add, edit
+    and delete (including undo, redo and imports) updates it incrementally.
+    Loading a project drops all indexes.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._sections = {}
+        model.add_listener(self.update)
+
+    def search(self, section, query):
+        index = self._sections.get(section)
+        if index is None or len(index) != len(self.model.sections[section]):
+            # Not built yet, or the section was replaced without a notification
+            index = self._sections[section] = SectionIndex(self.model.sections[section])
+        return index.search(query)
+
+    def update(self, operation, *args):
+        if operation == "load_project_data":
+            self._sections.clear()
+            return
+        index = self._sections.get(args[0]) if args else None
+        if index is None:
+            return
+        if operation == "add_entry":
+            index.insert(len(index), [args[1]])
+        elif operation == "add_entries":
+            index.insert(len(index), args[1])
+        elif operation == "insert_entry":
+            index.insert(args[1], [args[2]])
+        elif operation == "edit_entry":
+            index.replace(args[1], args[2])
+        elif operation == "delete_entry":
+            index.delete(args[1])
+        elif operation == "delete_entries":
+            index.delete(args[1], args[2])
@@ -0,0 +1,161 @@
+from latex_escape import escape_latex, LATEX_SPECIAL_CHARS
+from records import make_record_type
+
+
+class SectionRenderer:
+    """One list section: its editor fields and the moderncv macro each entry renders to"""
+
+    def __init__(self, key, title, tab_label, tip, fields, macro, args):
+        self.key = key
+        self.title = title
+        self.tab_label = tab_label
+        self.tip = tip
+        self.fields = fields  # [(label, field)] as shown in the editor
+        self.macro = macro
+        self.args = args
+        self.template = "\\" + macro + "".join("{{" + arg + "}}" for arg in args) + "\n"
+        self.field_names = [field for _, field in fields]
+        self.record = make_record_type(key.title().replace("_", "") + "Entry", self.field_names)
+        self._render = None
+
+    def as_record(self, entry):
+        return entry if entry.__class__ is self.record else self.record(**entry)
+
+    def to_records(self, entries):
+        """Records for a list of entries in the project file layout (dicts)"""
+        record = self.record
+        return [entry if entry.__class__ is record else record(**entry) for entry in entries]
+
+    def _prepare(self):
+        self._render_raw = self._compile(escape=False)
+        literal = self._render_raw([self.record()])
+        self._special_counts = [(char, literal.count(char)) for char in LATEX_SPECIAL_CHARS]
+        self._render = self._compile(escape=True)
+
+    def _compile(self, escape):
+        """Function rendering a list of records with the macro template, escaping fields if asked"""
+        import string
+        parts = []
+        for literal, name, spec, conversion in string.Formatter().parse(self.template):
+            parts.append(literal.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+                         .replace("{", "{{").replace("}", "}}"))
+            if name is None:
+                continue
+            if name not in self.field_names or not name.isidentifier() or spec or conversion:
+                raise ValueError(f"Section {self.key!r} has an invalid field reference: {name!r}")
+            value = "entry." + name
+            parts.append("{" + (f"escape_latex({value})" if escape else value) + "}")
+        source = 'def render(entries):\n    return "".join([f"' + "".join(parts) + '" for entry in entries])\n'
+        namespace = {"escape_latex": escape_latex}
+        exec(compile(source, f"<section {self.key}>", "exec"), namespace)
+        return namespace["render"]
+
+    def render_entries(self, entries, raw=False):
+        """LaTeX for entries; escaping is skipped when no field contains a special character"""
+        if self._render is None:
+            self._prepare()
+        try:
+            text = self._render_raw(entries)
+        except AttributeError:
+            # Dicts assigned straight to model.sections
+            entries = self.to_records(entries)
+            text = self._render_raw(entries)
+        if raw:
+            return text
+        count = len(entries)
+        if all(text.count(char) == per_entry * count for char, per_entry in self._special_counts):
+            return text
+        return self._render(entries)
+
+
+class TextSection:
+    """Free-text section inserted verbatim (e.g. the summary)"""
+
+    def __init__(self, key, title, tab_label, tip):
+        self.key = key
+        self.title = title
+        self.tab_label = tab_label
+        self.tip = tip
+        self.fields = None
+
+    def to_records(self, text):
+        return text
+
+    def render_text(self, text, raw=False):
+        return text if raw else escape_latex(text)
+
+
+SECTION_TYPES = [
+    TextSection("summary", "Summary", "Summary", "Write a 3-5 sentence professional summary"),
+    SectionRenderer(
+        "education", "Education", "Education", "List your degrees and certifications",
+        fields=[("Degree", "degree"), ("Institution", "institution"), ("Start Year", "start"),
+                ("End Year", "end"), ("Details", "details")],
+        macro="cventry",
+        args=["{start}--{end}", "{degree}", "{institution}", "", "", "{details}"]
+    ),
+    SectionRenderer(
+        "experience", "Professional Experience", "Experience", "Detail your professional work history",
+        fields=[("Job Title", "job_title"), ("Company", "company"), ("Start Year", "start"),
+                ("End Year", "end"), ("Details", "details")],
+        macro="cventry",
+        args=["{start}--{end}", "{job_title}", "{company}", "", "", "{details}"]
+    ),
+    SectionRenderer(
+        "research", "Research Projects", "Research", "Describe your research experience",
+        fields=[("Project Title", "project_title"), ("Institution", "institution"), ("Start Year", "start"),
+                ("End Year", "end"), ("Details", "details")],
+        macro="cventry",
+        args=["{start}--{end}", "{project_title}", "{institution}", "", "", "{details}"]
+    ),
+    SectionRenderer(
+        "projects", "Personal Open Source Projects", "Projects", "Showcase your open-source projects",
+        fields=[("Project Name", "project_name"), ("Years", "years"), ("Description", "description")],
+        macro="cvitem",
+        args=["{years}", "\\textbf{{{project_name}}} {description}"]
+    ),
+    SectionRenderer(
+        "skills", "Technical Skills", "Skills", "List your technical skills",
+        fields=[("Category", "category"), ("Items", "items")],
+        macro="cvitem",
+        args=["{category}", "{items}"]
+    ),
+    SectionRenderer(
+        "awards", "Awards", "Awards", "Highlight your achievements",
+        fields=[("Year", "year"), ("Award Name", "award_name"), ("Organization", "organization")],
+        macro="cvitem",
+        args=["{year}", "{award_name} - {organization}"]
+    ),
+    SectionRenderer(
+        "publications", "Publications", "Publications", "List your academic publications",
+        fields=[("Year", "year"), ("Title", "title"), ("Authors", "authors"), ("Venue", "venue")],
+        macro="cvitem",
+        args=["{year}", "{authors}. ``{title}''. {venue}, {year}."]
+    ),
+    SectionRenderer(
+        "languages", "Languages", "Languages", "List languages you speak",
+        fields=[("Language", "language"), ("Proficiency", "proficiency")],
+        macro="cvitem",
+        args=["{language}", "{proficiency}"]
+    )
+]
+
+# Editor tab order
+SECTION_REGISTRY = {section.key: section for section in SECTION_TYPES}
+
+# Order of sections in the generated document
+RENDER_ORDER = ["summary", "education", "research", "experience", "projects",
+                "skills", "awards", "publications", "languages"]
+
+
+def section_records(key, value):
+    """Model value of a section read from a project file: records for list sections"""
+    section = SECTION_REGISTRY.get(key)
+    return value if section is None else section.to_records(value)
+
+
+def register_section(section, position=None):
+    """Add a section type; it is rendered after the built-in ones unless position is given"""
+    SECTION_REGISTRY[section.key] = section
+    SECTION_TYPES.append(section)
+    RENDER_ORDER.insert(len(RENDER_ORDER) if position is None else position, section.key)
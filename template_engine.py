@@ -0,0 +1,148 @@
+import os
+import threading
+
+# LaTeX-friendly Jinja delimiters: braces stay plain LaTeX, so templates no
+# longer need the {{ }} doubling that str.format required.
+LATEX_SYNTAX = {
+    "block_start_string": r"\BLOCK{",
+    "block_end_string": "}",
+    "variable_start_string": r"\VAR{",
+    "variable_end_string": "}",
+    "comment_start_string": r"\#{",
+    "comment_end_string": "}",
+    "trim_blocks": True,
+    "keep_trailing_newline": True,
+    "autoescape": False
+}
+
+FALLBACK_KEY = "<fallback>"
+
+
+class TemplateFieldError(KeyError):
+    """Raised when a template references a value that was not provided"""
+
+
+def make_environment():
+    """Jinja environment for LaTeX templates; jinja2 is imported on first use, not at startup"""
+    from jinja2 import Environment, StrictUndefined
+    return Environment(undefined=StrictUndefined, **LATEX_SYNTAX)
+
+
+class CompiledTemplate:
+    """A parsed Jinja template plus the identity of the source it came from"""
+
+    def __init__(self, template, source, digest, mtime_ns=None, size=None):
+        self.template = template
+        self.source = source
+        self.digest = digest
+        self.mtime_ns = mtime_ns
+        self.size = size
+
+    def has_block(self, name):
+        return name in self.template.blocks
+
+    def render(self, **context):
+        from jinja2.exceptions import UndefinedError
+        try:
+            return self.template.render(**context)
+        except UndefinedError as e:
+            raise TemplateFieldError(str(e)) from e
+
+    def render_block(self, name, **context):
+        """Render a single named block without touching the rest of the document"""
+        from jinja2.exceptions import UndefinedError
+        block = self.template.blocks[name]
+        try:
+            return "".join(block(self.template.new_context(context)))
+        except UndefinedError as e:
+            raise TemplateFieldError(str(e)) from e
+
+
+class FormatTemplate(CompiledTemplate):
+    """Pre-Jinja template written for str.format (with {{ }} brace doubling)"""
+
+    def __init__(self, source, digest, mtime_ns=None, size=None):
+        super().__init__(None, source, digest, mtime_ns, size)
+
+    def has_block(self, name):
+        return False
+
+    def render(self, **context):
+        try:
+            return self.source.format(**context)
+        except KeyError as e:
+            raise TemplateFieldError(str(e)) from e
+
+    def render_block(self, name, **context):
+        raise KeyError(name)
+
+
+class TemplateCache:
+    """Compile each template once and reuse it until the file changes.
+
+    A changed mtime or size triggers a re-read, but the template is only
+    re-parsed when the content hash differs as well (e.g. a `touch` or a
+    checkout that rewrites identical bytes keeps the compiled form).
+    """
+
+    def __init__(self, environment=None):
+        self._environment = environment
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    @property
+    def environment(self):
+        if self._environment is None:
+            self._environment = make_environment()
+        return self._environment
+
+    def compile(self, source, mtime_ns=None, size=None):
+        import hashlib
+        digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        if r"\VAR{" not in source and r"\BLOCK{" not in source:
+            return FormatTemplate(source, digest, mtime_ns, size)
+        template = self.environment.from_string(source)
+        return CompiledTemplate(template, source, digest, mtime_ns, size)
+
+    def get(self, path, fallback_source=None):
+        """Return the compiled template at path, or the compiled fallback if missing"""
+        import hashlib
+        path = str(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            if fallback_source is None:
+                raise
+            return self._get_fallback(fallback_source)
+
+        with self._lock:
+            cached = self._compiled.get(path)
+            if cached and cached.mtime_ns == st.st_mtime_ns and cached.size == st.st_size:
+                return cached
+
+            with open(path, "r", encoding="utf-8") as f:
+                source = f.read()
+            digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+            if cached and cached.digest == digest:
+                cached.mtime_ns, cached.size = st.st_mtime_ns, st.st_size
+                return cached
+
+            compiled = self.compile(source, st.st_mtime_ns, st.st_size)
+            self._compiled[path] = compiled
+            return compiled
+
+    def _get_fallback(self, source):
+        with self._lock:
+            cached = self._compiled.get(FALLBACK_KEY)
+            if cached is None or cached.source != source:
+                cached = self.compile(source)
+                self._compiled[FALLBACK_KEY] = cached
+            return cached
+
+    def clear(self):
+        with self._lock:
+            self._compiled.clear()
+
+
+# Shared by every CVModel in the process
+template_cache = TemplateCache()
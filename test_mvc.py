@@ -3,8 +3,37 @@
 Test script for MVC CV Editor
 """
 
+import io
+import json
+import os
+import sys
+import random
+import subprocess
+import time
+import tempfile
+import threading
+import tracemalloc
 import tkinter as tk
 from model import CVModel
+from pdf_cache import PDFCache
+from template_engine import TemplateCache
+from compile_queue import CompileQueue
+from compile_runner import CompileRunner
+from latex_log import LatexLogParser
+from engines import FakeEngine
+from batch import run_batch, REPORT_NAME
+import preamble_format
+from preamble_format import PreambleFormat
+import fonts
+from fonts import resolve_font, reset_font_cache
+from sections import SectionRenderer, SECTION_REGISTRY, SECTION_TYPES, RENDER_ORDER, register_section
+from latex_escape import escape_latex
+from benchmark import measure_entry_memory
+from benchmark import measure_import_time, measure_first_frame, IMPORT_BUDGET_MS, FIRST_FRAME_BUDGET_MS, DEFERRED_MODULES
+from project_format import convert_project, is_binary_project
+from autosave import Autosave
+from bibtex import iter_bibtex, publication_from_bibtex, import_publications
+from search_index import tokenize
 from view import CVEditorView
 from controller import CVEditorController
 
@@ -34,6 +63,64 @@ def test_latex_generation():
         print(f"❌ LaTeX generation failed: {e}")
         return False
 
+def test_incremental_sections():
+    """Test that only dirty sections are rebuilt"""
+    print("\nTesting incremental section rendering...")
+    
+    model = CVModel()
+    model.generate_latex()
+    
+    rebuilt = []
+    build_section = model.build_section
+    model.build_section = lambda key, title: rebuilt.append(key) or build_section(key, title)
+    
+    try:
+        model.generate_latex()
+        assert rebuilt == [], f"clean sections were rebuilt: {rebuilt}"
+        
+        model.add_entry("awards", {"year": "2025", "award_name": "Best Paper", "organization": "IEEE"})
+        latex_content = model.generate_latex()
+        assert rebuilt == ["awards"], f"expected only awards to rebuild, got {rebuilt}"
+        assert "Best Paper" in latex_content
+        
+        model.toggle_section("awards", False)
+        assert "Best Paper" not in model.generate_latex()
+        assert rebuilt == ["awards"]
+        print("✅ Incremental rendering working!")
+        return True
+    except Exception as e:
+        print(f"❌ Incremental rendering failed: {e!r}")
+        return False
+
+def test_template_cache():
+    """Test that templates are compiled once and reloaded only on change"""
+    print("\nTesting template cache...")
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "cv_template.tex")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(r"\name{\VAR{name_first}}\BLOCK{block section}[\VAR{section_title}]\BLOCK{endblock}")
+            
+            cache = TemplateCache()
+            first = cache.get(path)
+            os.utime(path, (0, 0))  # Same content, new mtime: no re-parse
+            assert cache.get(path) is first
+            assert first.render(name_first="Ada", section_title="X") == r"\name{Ada}[X]"
+            assert first.render_block("section", section_title="Skills") == "[Skills]"
+            
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(r"\name{{{name_first}}}")  # Legacy str.format template
+            os.utime(path, (1, 1))
+            legacy = cache.get(path)
+            assert legacy is not first
+            assert legacy.render(name_first="Ada") == r"\name{Ada}"
+        print("✅ Template cache working!")
+        return True
+    except Exception as e:
+        print(f"❌ Template cache failed: {e!r}")
+        return False
+
 def test_pdf_compilation():
     """Test PDF compilation"""
     print("\nTesting PDF compilation...")
@@ -56,15 +143,851 @@ def test_pdf_compilation():
         print(f"❌ PDF compilation failed: {e}")
         return False
 
+def test_fake_engine_compilation():
+    """Test the compile path end to end with the fake XeLaTeX engine"""
+    print("\nTesting PDF compilation with fake engine...")
+    
+    results = []
+    pages = []
+    callback = lambda success, pdf_path, message: results.append(
+        (success, open(pdf_path, "rb").read(8) if success else None, message))
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            model = CVModel(engine=FakeEngine(latency=0.05, chars_per_page=1000))
+            model.pdf_cache = PDFCache(tmpdir)
+            latex_content = model.generate_latex()
+            
+            # The compile worker must not touch the template the Tk thread renders with
+            model.get_template = None
+            model.compile_latex(latex_content, callback, progress=lambda done, expected: pages.append(done))
+            model.compile_latex(latex_content, callback)
+            assert results[0] == (True, b"%PDF-1.4", "PDF generated successfully"), results[0]
+            assert results[1][2] == "PDF loaded from cache"
+            assert pages and pages == list(range(1, len(pages) + 1))
+            
+            failing = CVModel(engine=FakeEngine(fail=True))
+            failing.pdf_cache = None
+            failing.compile_latex(latex_content, callback)
+            assert results[2][0] is False and "! Undefined control sequence." in results[2][2]
+        print("✅ Fake engine compilation working!")
+        return True
+    except Exception as e:
+        print(f"❌ Fake engine compilation failed: {e!r}")
+        return False
+
+def test_batch_render():
+    """Test that a batch renders every project and reports the broken one without stopping"""
+    print("\nTesting batch rendering...")
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            projects = []
+            for name in ("alice", "broken", "carol"):
+                model = CVModel()
+                model.update_personal_info("name_first", name.title())
+                if name == "broken":
+                    model.set_raw_latex("summary", True)
+                    model.update_section("summary", "\\fakeerror")
+                projects.append(os.path.join(tmpdir, f"{name}.cvproj"))
+                model.save_project(projects[-1])
+            
+            output_dir = os.path.join(tmpdir, "out")
+            report = run_batch(projects, output_dir, workers=2,
+                               options={"engine": "fake", "fake_latency": 0, "no_cache": True})
+            assert (report["total"], report["succeeded"], report["failed"]) == (3, 2, 1), report
+            with open(os.path.join(output_dir, REPORT_NAME), "r", encoding="utf-8") as f:
+                results = {os.path.basename(r["project"]): r for r in json.load(f)["results"]}
+            assert not results["broken.cvproj"]["success"] and results["broken.cvproj"]["pdf"] is None
+            assert "Undefined control sequence" in results["broken.cvproj"]["message"]
+            for name in ("alice", "carol"):
+                assert results[f"{name}.cvproj"]["success"]
+                with open(os.path.join(output_dir, f"{name}.pdf"), "rb") as f:
+                    assert f.read(8) == b"%PDF-1.4"
+            assert not os.path.exists(os.path.join(output_dir, "broken.pdf"))
+        print("✅ Batch rendering working!")
+        return True
+    except Exception as e:
+        print(f"❌ Batch rendering failed: {e!r}")
+        return False
+
+def test_pdf_cache():
+    """Test PDF cache hits, misses and LRU eviction"""
+    print("\nTesting PDF cache...")
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = PDFCache(os.path.join(tmpdir, "cache"), max_bytes=2048)
+            pdf_path = os.path.join(tmpdir, "cv.pdf")
+            with open(pdf_path, "wb") as f:
+                f.write(b"%PDF-1.4" + b"0" * 1000)
+            
+            first = cache.make_key("latex A", "XeTeX 3.14")
+            second = cache.make_key("latex B", "XeTeX 3.14")
+            third = cache.make_key("latex C", "XeTeX 3.14")
+            assert first != cache.make_key("latex A", "XeTeX 3.15")
+            
+            assert cache.get(first) is None
+            cache.put(first, pdf_path)
+            assert cache.get(first) == cache.path_for(first)
+            cache.put(second, pdf_path)
+            os.utime(cache.path_for(first), (0, 0))  # Make the first entry the oldest
+            cache.put(third, pdf_path)
+            
+            stats = cache.stats()
+            assert cache.get(first) is None, "least recently used entry should be evicted"
+            assert stats["entries"] == 2 and stats["hits"] == 1 and stats["misses"] == 1
+        print("✅ PDF cache working!")
+        return True
+    except Exception as e:
+        print(f"❌ PDF cache failed: {e!r}")
+        return False
+
+def test_build_directory():
+    """Test the persistent build directory: project switches, size budget and stable PDF paths"""
+    print("\nTesting build directory...")
+    
+    results = []
+    callback = lambda success, pdf_path, message: results.append((success, pdf_path))
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            model = CVModel(engine=FakeEngine())
+            model.pdf_cache = None
+            model.set_project_path(os.path.join(tmpdir, "first.cvproj"))
+            model.use_build_dir(root=tmpdir)
+            first_dir = model.build_dir.path
+            latex_content = model.generate_latex()
+            
+            # The published PDF survives the next compile reusing the directory
+            model.compile_latex(latex_content, callback)
+            success, pdf_path = results[0]
+            assert success and os.path.dirname(pdf_path) == first_dir
+            seen_during_rerun = []
+            model.compile_latex(latex_content + "%", callback,
+                                progress=lambda done, expected: seen_during_rerun.append(os.path.exists(pdf_path)))
+            assert results[1] == (True, pdf_path) and seen_during_rerun and all(seen_during_rerun)
+            with open(pdf_path, "rb") as f:
+                assert f.read(8) == b"%PDF-1.4"
+            
+            # Going over max_bytes starts cold again
+            junk_path = os.path.join(first_dir, "junk.bin")
+            with open(junk_path, "wb") as f:
+                f.write(b"0" * 2048)
+            model.build_dir.max_bytes = 1024
+            model.build_dir.prepare()
+            assert os.path.isdir(first_dir) and not os.listdir(first_dir)
+            
+            # Switching projects removes the previous project's directory
+            model.compile_latex(latex_content, callback)
+            model.set_project_path(os.path.join(tmpdir, "second.cvproj"))
+            assert not os.path.exists(first_dir)
+            assert model.build_dir.path != first_dir and os.path.dirname(model.build_dir.path) == tmpdir
+        print("✅ Build directory working!")
+        return True
+    except Exception as e:
+        print(f"❌ Build directory failed: {e!r}")
+        return False
+
+def test_preamble_format():
+    """Test that preamble or engine changes rebuild the format and identical calls reuse it"""
+    print("\nTesting preamble format...")
+    
+    version = ["XeTeX 3.14"]
+    dumped = []
+    saved = preamble_format.engine_version, preamble_format.installation_stamp
+    preamble_format.engine_version = lambda engine: version[0]
+    preamble_format.installation_stamp = lambda engine: "texmf:1"
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            formats = PreambleFormat(tmpdir)
+            
+            def fake_dump(name, preamble):
+                dumped.append(name)
+                with open(os.path.join(tmpdir, f"{name}.fmt"), "w", encoding="utf-8") as f:
+                    f.write(preamble)
+                return True
+            formats._dump = fake_dump
+            
+            first = formats.ensure("\\usepackage{a}")
+            assert formats.ensure("\\usepackage{a}") == first and dumped == [first]
+            second = formats.ensure("\\usepackage{b}")
+            assert second != first and dumped == [first, second]
+            version[0] = "XeTeX 3.141"
+            third = formats.ensure("\\usepackage{b}")
+            assert third not in (first, second) and dumped == [first, second, third]
+            assert formats.ensure("\\usepackage{b}") == third and len(dumped) == 3
+            
+            # Text after the dump marker (the main font) does not make a new format
+            marked = formats.ensure("\\usepackage{d}" + preamble_format.DUMP_MARKER + "\\setmainfont{Arial}")
+            assert formats.ensure("\\usepackage{d}" + preamble_format.DUMP_MARKER + "\\setmainfont{Carlito}") == marked
+            assert len(dumped) == 4
+            
+            # Formats still in use (e.g. by another process) are kept; unused ones go
+            assert all(os.path.exists(os.path.join(tmpdir, f"{name}.fmt")) for name in dumped)
+            old = time.time() - preamble_format.STALE_FORMAT_SECONDS - 60
+            os.utime(os.path.join(tmpdir, f"{first}.fmt"), (old, old))
+            formats.ensure("\\usepackage{c}")
+            assert not os.path.exists(os.path.join(tmpdir, f"{first}.fmt"))
+            assert os.path.exists(os.path.join(tmpdir, f"{second}.fmt"))
+        print("✅ Preamble format working!")
+        return True
+    except Exception as e:
+        print(f"❌ Preamble format failed: {e!r}")
+        return False
+    finally:
+        preamble_format.engine_version, preamble_format.installation_stamp = saved
+
+def test_font_resolution():
+    """Test that a missing font is substituted and fontconfig is probed only once"""
+    print("\nTesting font resolution...")
+    
+    probes = []
+    real_run = subprocess.run
+    fontconfig_platform = fonts.FONTCONFIG_PLATFORM
+    
+    def fake_run(command, *args, **kwargs):
+        if command[0] != "fc-list":
+            return real_run(command, *args, **kwargs)
+        probes.append(command)
+        return subprocess.CompletedProcess(command, 0, "DejaVu Sans\nLiberation Sans,Liberation Sans Narrow\nLatin Modern Roman\n", "")
+    
+    reset_font_cache()
+    subprocess.run = fake_run
+    try:
+        assert resolve_font("Arial") == "Liberation Sans"
+        assert resolve_font("Arial") == "Liberation Sans"
+        assert resolve_font("DejaVu Sans") == "DejaVu Sans"
+        assert resolve_font("Comic Sans MS") is None
+        assert len(probes) == 1, probes
+        
+        # Without fontconfig tools on Linux, nothing is assumed installed
+        reset_font_cache()
+        fonts.FONTCONFIG_PLATFORM = True
+        def missing_fc_list(command, *args, **kwargs):
+            probes.append(command)
+            raise FileNotFoundError(command[0])
+        subprocess.run = missing_fc_list
+        assert resolve_font("Arial") is None
+        assert resolve_font("Times New Roman") is None
+        assert len(probes) == 2, probes
+        print("✅ Font resolution working!")
+        return True
+    except Exception as e:
+        print(f"❌ Font resolution failed: {e!r}")
+        return False
+    finally:
+        subprocess.run = real_run
+        fonts.FONTCONFIG_PLATFORM = fontconfig_platform
+        reset_font_cache()
+
+def test_compile_queue():
+    """Test that rapid compile requests coalesce to the latest snapshot"""
+    print("\nTesting compile queue...")
+    
+    started = []
+    cancelled = []
+    results = []
+    done = threading.Event()
+    
+    def fake_compile(latex_content, callback, cancel_event, progress):
+        started.append(latex_content)
+        if cancel_event.wait(0.2):
+            cancelled.append(latex_content)
+            callback(False, None, "Compilation cancelled")
+        else:
+            callback(True, f"/tmp/{latex_content}.pdf", "PDF generated successfully")
+    
+    def on_result(success, pdf_path, message):
+        results.append(pdf_path)
+        done.set()
+    
+    try:
+        queue = CompileQueue(fake_compile)
+        queue.submit("v1", on_result)
+        time.sleep(0.05)  # Let v1 start
+        for version in ("v2", "v3", "v4"):
+            queue.submit(version, on_result)
+        assert done.wait(2), "no result delivered"
+        time.sleep(0.1)
+        queue.shutdown()
+        
+        assert started == ["v1", "v4"], f"unexpected compiles: {started}"
+        assert cancelled == ["v1"]
+        assert results == ["/tmp/v4.pdf"], f"unexpected results: {results}"
+        
+        # Resubmitting the content being compiled joins that run instead of queueing it again
+        started.clear()
+        same_results = []
+        queue = CompileQueue(fake_compile)
+        queue.submit("same", lambda *result: same_results.append(("first", result[1])))
+        time.sleep(0.05)
+        queue.submit("same", lambda *result: same_results.append(("second", result[1])))
+        deadline = time.monotonic() + 2
+        while len(same_results) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        queue.shutdown()
+        assert started == ["same"], f"unexpected compiles: {started}"
+        assert same_results == [("first", "/tmp/same.pdf"), ("second", "/tmp/same.pdf")], same_results
+        print("✅ Compile queue working!")
+        return True
+    except Exception as e:
+        print(f"❌ Compile queue failed: {e!r}")
+        return False
+
+def test_live_preview():
+    """Test that a superseded PDF request gets the newer result and unchanged previews are not recompiled"""
+    print("\nTesting live preview scheduling...")
+    
+    def fake_compile(latex_content, callback, cancel_event, progress):
+        if cancel_event.wait(0.2):
+            callback(False, None, "Compilation cancelled")
+        else:
+            callback(True, f"/tmp/{latex_content}.pdf", "PDF generated successfully")
+    
+    class StubRoot:
+        def after(self, delay, callback, *args):
+            callback(*args)
+            return "after#1"
+        
+        def after_cancel(self, after_id):
+            pass
+    
+    class StubView:
+        def pull_edits(self):
+            return {}, {}
+        
+        def show_preview_status(self, text):
+            pass
+    
+    class StubQueue:
+        def __init__(self):
+            self.submitted = []
+        
+        def submit(self, latex_content, on_result):
+            self.submitted.append(latex_content)
+    
+    try:
+        # A "Generate PDF" request replaced by a preview still receives the newer PDF
+        results = {}
+        done = threading.Event()
+        queue = CompileQueue(fake_compile)
+        queue.submit("v1", lambda *result: results.setdefault("generate", result[1]))
+        time.sleep(0.05)
+        queue.submit("v2", lambda *result: (results.setdefault("preview", result[1]), done.set()))
+        assert done.wait(2), "no result delivered"
+        queue.shutdown()
+        assert results == {"generate": "/tmp/v2.pdf", "preview": "/tmp/v2.pdf"}, results
+        
+        # Refreshing the preview without changes does not compile again
+        app = CVEditorController.__new__(CVEditorController)
+        app.root, app.view, app.model = StubRoot(), StubView(), CVModel()
+        app.compile_queue = StubQueue()
+        app.live_preview, app._preview_after, app._preview_latex = True, None, None
+        app.schedule_preview()
+        app.schedule_preview()
+        assert len(app.compile_queue.submitted) == 1
+        app.model.update_personal_info("name_first", "Ada")
+        app.schedule_preview()
+        assert len(app.compile_queue.submitted) == 2
+        print("✅ Live preview scheduling working!")
+        return True
+    except Exception as e:
+        print(f"❌ Live preview scheduling failed: {e!r}")
+        return False
+
+def test_compile_runner():
+    """Test that runaway compiles are stopped by timeout, cancel and memory limit"""
+    print("\nTesting compile runner limits...")
+    
+    hang = [sys.executable, "-c", "import time; time.sleep(30)"]
+    try:
+        runner = CompileRunner(timeout=0.3)
+        started = time.monotonic()
+        result = runner.run(hang)
+        assert result.status == "timeout" and result.stopped
+        assert time.monotonic() - started < 5, "timed out process was not killed"
+        assert "timed out" in runner.describe(result)
+        
+        runner = CompileRunner(timeout=None)
+        threading.Timer(0.2, runner.cancel).start()
+        result = runner.run(hang)
+        assert result.status == "cancelled"
+        
+        result = runner.run([sys.executable, "-c", "print('ok')"])
+        assert result.status == "ok" and result.stdout.strip() == "ok"
+        
+        if os.name == "posix":
+            runner = CompileRunner(memory_bytes=512 * 2 ** 20)
+            result = runner.run([sys.executable, "-c", "blob = bytearray(2 ** 31)"])
+            assert result.status == "memory-limit" and result.stopped, result.stdout
+            assert "out of memory" in runner.describe(result)
+            result = runner.run([sys.executable, "-c", "raise SystemExit(1)"])
+            assert result.status == "failed"
+        print("✅ Compile runner limits working!")
+        return True
+    except Exception as e:
+        print(f"❌ Compile runner failed: {e!r}")
+        return False
+
+def test_log_parser():
+    """Test incremental XeLaTeX log parsing for pages and errors"""
+    print("\nTesting LaTeX log parser...")
+    
+    pages = []
+    output = [
+        "This is XeTeX, Version 3.141592653",
+        "(./cv.tex (/usr/share/texmf/moderncv.cls) [1] [2",
+        "] (./cv.aux [3{/fonts/map}]",
+        "! Misplaced alignment tab character &.",
+        "<argument> R&",
+        "l.42 \\cventry{2017}{R&D}",
+        "Output written on cv.pdf (3 pages)."
+    ]
+    try:
+        parser = LatexLogParser(on_page=pages.append)
+        for line in output:
+            parser.feed(line + "\n")
+        assert pages == [1, 2, 3], f"unexpected pages: {pages}"
+        assert parser.error_excerpt().splitlines() == output[3:6]
+        print("✅ LaTeX log parser working!")
+        return True
+    except Exception as e:
+        print(f"❌ LaTeX log parser failed: {e!r}")
+        return False
+
+def test_section_registry():
+    """Test table-driven section rendering and registering a new section"""
+    print("\nTesting section registry...")
+    
+    talks = SectionRenderer("talks", "Invited Talks", "Talks", "List your invited talks",
+                            fields=[("Year", "year"), ("Title", "title")],
+                            macro="cvitem", args=["{year}", "\\emph{{{title}}}"])
+    try:
+        renderer = SECTION_REGISTRY["education"]
+        entries = [{"degree": "BSc", "institution": "USP", "start": "2017", "end": "2021", "details": "Honours"}]
+        assert renderer.render_entries(entries) == "\\cventry{2017--2021}{BSc}{USP}{}{}{Honours}\n"
+        # Entries from older project files may miss fields
+        assert renderer.render_entries([{"degree": "BSc"}]) == "\\cventry{--}{BSc}{}{}{}{}\n"
+        
+        register_section(talks)
+        model = CVModel()
+        model.add_entry("talks", {"year": "2024", "title": "Fast CVs"})
+        latex = model.generate_latex()
+        assert "\\cvitem{2024}{\\emph{Fast CVs}}" in latex
+        assert latex.index("Invited Talks") > latex.index("Languages")
+        print("✅ Section registry working!")
+        return True
+    except Exception as e:
+        print(f"❌ Section registry failed: {e!r}")
+        return False
+    finally:
+        SECTION_REGISTRY.pop("talks", None)
+        if talks in SECTION_TYPES:
+            SECTION_TYPES.remove(talks)
+        if "talks" in RENDER_ORDER:
+            RENDER_ORDER.remove("talks")
+
+def test_latex_escaping():
+    """Test escaping of LaTeX special characters in user fields"""
+    print("\nTesting LaTeX escaping...")
+    
+    try:
+        assert escape_latex("R&D: 100% of C# & a_b {x} $5 ^ \\") == \
+            "R\\&D: 100\\% of C\\# \\& a\\_b \\{x\\} \\$5 \\textasciicircum{} \\textbackslash{}"
+        assert escape_latex("Dr.~Smith") == "Dr.~Smith"
+        
+        model = CVModel()
+        model.update_personal_info("title", "Engineer_in_R&D")
+        model.add_entry("skills", {"category": "Tools", "items": "C#, 100%"})
+        model.update_section("summary", "\\textbf{Bold} summary")
+        latex = model.generate_latex()
+        assert "\\title{Engineer\\_in\\_R\\&D}" in latex
+        assert "\\cvitem{Tools}{C\\#, 100\\%}" in latex
+        assert "\\textbf{Bold} summary" in latex  # Summary is raw LaTeX by default
+        
+        model.set_raw_latex("skills", True)
+        model.set_raw_latex("summary", False)
+        latex = model.generate_latex()
+        assert "\\cvitem{Tools}{C#, 100%}" in latex
+        assert "\\textbackslash{}textbf\\{Bold\\} summary" in latex
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "project.json")
+            model.save_project(path)
+            loaded = CVModel()
+            loaded.load_project(path)
+            assert loaded.raw_latex_sections == {"skills"}, loaded.raw_latex_sections
+        print("✅ LaTeX escaping working!")
+        return True
+    except Exception as e:
+        print(f"❌ LaTeX escaping failed: {e!r}")
+        return False
+
+def test_startup_budget():
+    """Test that opening the editor stays within its cold-start budget"""
+    print("\nTesting startup budget...")
+    
+    try:
+        import_ms, imported = measure_import_time()
+        print(f"   import controller: {import_ms:.1f} ms (budget {IMPORT_BUDGET_MS} ms)")
+        eager = sorted(set(DEFERRED_MODULES) & imported)
+        assert not eager, f"imported at startup: {eager}"
+        assert import_ms <= IMPORT_BUDGET_MS, f"import took {import_ms:.1f} ms"
+        
+        first_frame_ms = measure_first_frame()
+        if first_frame_ms is None:
+            print("   first frame: skipped (no display)")
+        else:
+            print(f"   first frame: {first_frame_ms:.1f} ms (budget {FIRST_FRAME_BUDGET_MS} ms)")
+            assert first_frame_ms <= FIRST_FRAME_BUDGET_MS, f"first frame took {first_frame_ms:.1f} ms"
+        print("✅ Startup within budget!")
+        return True
+    except Exception as e:
+        print(f"❌ Startup budget failed: {e!r}")
+        return False
+
+def test_project_formats():
+    """Test the compact project format, lazy section loading and JSON compatibility"""
+    print("\nTesting project formats...")
+    
+    try:
+        model = CVModel()
+        model.add_entry("publications", {"year": "2024", "title": "Über LaTeX", "authors": "A. B.", "venue": "J"})
+        model.update_personal_info("name_first", "João")
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "old.cvproj")
+            binary_path = os.path.join(tmp, "new.cvproj")
+            model.save_project(json_path)
+            convert_project(json_path, binary_path)
+            assert not is_binary_project(json_path) and is_binary_project(binary_path)
+            assert os.path.getsize(binary_path) < os.path.getsize(json_path)
+            
+            loaded = CVModel()
+            assert loaded.load_project(binary_path)[0]
+            assert loaded.project_format == "binary"
+            assert loaded.sections.decoded() == set(), "sections decoded eagerly"
+            assert loaded.sections["publications"] == model.sections["publications"]
+            assert loaded.sections.decoded() == {"publications"}
+            assert loaded.personal_info["name_first"] == "João"
+            assert loaded.generate_latex() == model.generate_latex()
+            
+            # Opening a project over a lazily loaded one, and showing it, only decodes built tabs
+            class StubView:
+                shown = []
+                is_section_built = lambda self, section: section == "summary"
+                set_section_content = lambda self, section, content: self.shown.append(section)
+                set_personal_field = set_section_visibility = set_section_raw_latex = lambda self, *args: None
+            app = CVEditorController.__new__(CVEditorController)
+            app.model, app.view = CVModel(), StubView()
+            app.model.load_project(binary_path)
+            previous = app.model.sections
+            app.model.load_project(binary_path)
+            assert previous.decoded() == set() and app.model.sections.decoded() == set(), \
+                "sections decoded by load_project_data"
+            app.load_data_to_view()
+            assert app.view.shown == ["summary"] and app.model.sections.decoded() == {"summary"}
+            
+            # Saving keeps the compact format; untouched sections are copied as-is
+            loaded.delete_entry("publications", 0)
+            assert loaded.save_project(binary_path)[0]
+            reloaded = CVModel()
+            reloaded.load_project(binary_path)
+            assert dict(reloaded.sections) == dict(loaded.sections)
+            
+            # JSON projects still load as before
+            legacy = CVModel()
+            assert legacy.load_project(json_path)[0] and legacy.project_format == "json"
+            assert legacy.sections == model.sections
+        print("✅ Project formats working!")
+        return True
+    except Exception as e:
+        print(f"❌ Project formats failed: {e!r}")
+        return False
+
+def test_autosave():
+    """Test journal replay after a crash, background compaction and clearing on save"""
+    print("\nTesting autosave journal...")
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            project_path = os.path.join(tmp, "cv.cvproj")
+            model = CVModel()
+            model.save_project(project_path, "binary")
+            
+            # Edits since the last save survive a crash (the journal is never closed)
+            autosave = Autosave(model, directory=tmp, compact_every=3)
+            autosave.attach(project_path)
+            model.update_personal_info("name_first", "Ada")
+            model.add_entry("awards", {"year": "2023", "award_name": "Prize", "organization": "ACM"})
+            model.edit_entry("awards", 0, {"year": "2024", "award_name": "Prize", "organization": "ACM"})
+            model.add_entry("skills", {"category": "Languages", "items": "Python"})
+            model.toggle_section("skills", False)
+            autosave.wait()
+            journal_path, compacting_path, snapshot_path = autosave.paths()
+            assert os.path.exists(snapshot_path) and not os.path.exists(compacting_path)
+            
+            recovered = CVModel()
+            restarted = Autosave(recovered, directory=tmp)
+            assert restarted.last_session_project() == os.path.abspath(project_path)
+            recovered.load_project(project_path)
+            assert restarted.attach(project_path) == 5
+            assert recovered.generate_latex() == model.generate_latex()
+            
+            # A line torn by the crash is skipped, and the next edit is not written onto it
+            with open(journal_path, "a", encoding="utf-8") as f:
+                f.write('{"seq":6,"op":"delete_en')
+            torn = CVModel()
+            torn.load_project(project_path)
+            torn_autosave = Autosave(torn, directory=tmp)
+            assert torn_autosave.attach(project_path) == 5
+            torn.update_personal_info("name_last", "Lovelace")
+            again = CVModel()
+            again.load_project(project_path)
+            assert Autosave(again, directory=tmp).attach(project_path) == 6
+            assert again.personal_info["name_last"] == "Lovelace"
+            
+            # The unsaved project's journal is replayed only if the last session ended on it
+            untitled = CVModel()
+            untitled_autosave = Autosave(untitled, directory=tmp)
+            untitled_autosave.attach(None)
+            untitled.update_personal_info("name_first", "Abandoned")
+            untitled_autosave.attach(project_path)
+            assert Autosave(CVModel(), directory=tmp).attach(None) == 0
+            
+            # Saving makes the journal and snapshot obsolete
+            restarted.saved(project_path)
+            assert not os.path.exists(snapshot_path) and os.path.getsize(journal_path) == 0
+            assert restarted.last_session_project() is None
+            for each in (restarted, autosave, torn_autosave, untitled_autosave):
+                each.close()
+        print("✅ Autosave journal working!")
+        return True
+    except Exception as e:
+        print(f"❌ Autosave journal failed: {e!r}")
+        return False
+
+def test_undo_redo():
+    """Test undo/redo of every edit type and that history shares entries with the model"""
+    print("\nTesting undo/redo...")
+    
+    try:
+        model = CVModel()
+        original = model.generate_latex()
+        model.update_personal_info("name_first", "Ada")
+        model.update_section("summary", "Mathematician")
+        model.toggle_section("skills", False)
+        model.set_raw_latex("awards", True)
+        model.add_entry("awards", {"year": "1843", "award_name": "Notes", "organization": "Taylor"})
+        model.edit_entry("awards", 0, {"year": "1843", "award_name": "Note G", "organization": "Taylor"})
+        model.delete_entry("education", 0)
+        edited = model.generate_latex()
+        
+        steps = len(model.history)
+        calls = [model.undo() for _ in range(steps)]
+        assert model.undo() is None
+        assert calls[0] == (("insert_entry", ("education", 0, CVModel().sections["education"][0])),)
+        assert model.generate_latex() == original
+        for _ in range(steps):
+            model.redo()
+        assert model.redo() is None
+        assert model.generate_latex() == edited
+        
+        # A new edit discards the redo stack
+        model.undo()
+        model.update_personal_info("name_last", "Lovelace")
+        assert model.redo() is None
+        
+        # Steps reference entries rather than copying the section
+        entries = SECTION_REGISTRY["awards"].to_records(
+            {"year": str(i), "award_name": "x" * 200, "organization": "y"} for i in range(5000))
+        big = CVModel()
+        big.sections["awards"] = list(entries)
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(1000):
+            big.edit_entry("awards", i, entries[i].replace(year="0"))
+        per_step = (tracemalloc.get_traced_memory()[0] - before) / 1000
+        tracemalloc.stop()
+        assert per_step < 2000, f"{per_step:.0f} bytes per undo step"
+        for _ in range(1000):
+            big.undo()
+        assert all(a is b for a, b in zip(big.sections["awards"], entries))
+        print(f"✅ Undo/redo working ({per_step:.0f} bytes per step on a 5000-entry section)")
+        return True
+    except Exception as e:
+        print(f"❌ Undo/redo failed: {e!r}")
+        return False
+
+def test_entry_records():
+    """Test slotted entry records, their lossless project round trip and memory use"""
+    print("\nTesting entry records...")
+    
+    try:
+        publication = SECTION_REGISTRY["publications"].record
+        entry = publication(year="2024", title="On Records", authors="A. B.", venue="J")
+        assert not hasattr(entry, "__dict__")
+        assert entry.to_dict() == {"year": "2024", "title": "On Records", "authors": "A. B.", "venue": "J"}
+        assert entry.replace(year="2025").year == "2025" and entry.year == "2024"
+        assert publication.from_dict({"title": "x", "doi": "10/1"}).to_dict() == \
+            {"year": "", "title": "x", "authors": "", "venue": "", "doi": "10/1"}
+        
+        model = CVModel()
+        model.add_entry("publications", {"year": "2023", "title": "T", "authors": "A", "venue": "V", "note": "kept"})
+        assert all(e.__class__ is publication for e in model.sections["publications"])
+        with tempfile.TemporaryDirectory() as tmp:
+            for project_format in ("json", "binary"):
+                path = os.path.join(tmp, f"{project_format}.cvproj")
+                model.save_project(path, project_format)
+                loaded = CVModel()
+                loaded.load_project(path)
+                assert loaded.sections["publications"] == model.sections["publications"]
+                assert loaded.sections["publications"][-1].get("note") == "kept"
+                assert loaded.generate_latex() == model.generate_latex()
+        
+        usage = measure_entry_memory(5000)
+        assert usage["record"] < usage["dict"] * 0.9, usage
+        print(f"✅ Entry records working ({usage['dict']:.0f} -> {usage['record']:.0f} bytes per publication)")
+        return True
+    except Exception as e:
+        print(f"❌ Entry records failed: {e!r}")
+        return False
+
+def test_bibtex_import():
+    """Test streaming BibTeX parsing, mapping onto publications and de-duplication"""
+    print("\nTesting BibTeX import...")
+    
+    try:
+        sample = r'''
+        % comment mentioning me@example.org
+        @string{tot = "Transactions on " # "Things"}
+        @comment{ignored {entirely}}
+        @Article{knuth84,
+          author = {Knuth, Donald E. and L{\"u}tzen, Jesper and others},
+          title = "{The} {\TeX}book and {\'E}cole \c{c}ases",
+          journal = tot, year = 1984, month = jan,
+        }
+        @inproceedings(doe2020, title={Parens (really)}, booktitle={Proc. X}, date={2020-05-01}, author={Doe, Jr, John})
+        @misc{untitled, year = 2000}
+        '''
+        expected = [
+            {"year": "1984", "title": "The TeXbook and École çases",
+             "authors": "Donald E. Knuth, Jesper Lützen et al.", "venue": "Transactions on Things"},
+            {"year": "2020", "title": "Parens (really)", "authors": "John Doe Jr", "venue": "Proc. X"},
+            None
+        ]
+        for chunk_size in (1, 7, 65536):
+            records = list(iter_bibtex(io.StringIO(sample), chunk_size))
+            assert [key for _, key, _ in records] == ["knuth84", "doe2020", "untitled"]
+            assert [publication_from_bibtex(fields) for _, _, fields in records] == expected
+        
+        # 10,000 records plus repeats, against a section that already holds one of them
+        record = "@article{{k{i}, author={{Author, A.}}, title={{On Problem {i}}}, journal={{J}}, year={y}}}\n"
+        text = "".join(record.format(i=i, y=2000 + i % 25) for i in range(10000)) + record.format(i=5, y=2005)
+        model = CVModel()
+        model.add_entry("publications", {"year": "2007", "title": "On problem 7!", "authors": "", "venue": ""})
+        before = len(model.sections["publications"])
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "refs.bib")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+            with open(path, "r", encoding="utf-8") as f:
+                steps = list(import_publications(model, f))
+        elapsed = time.perf_counter() - started
+        assert len(steps) > 10, "import does not yield between batches"
+        assert steps[-1] == (9999, 2), steps[-1]
+        assert len(model.sections["publications"]) == before + 9999
+        assert elapsed < 5, f"{elapsed:.2f}s"
+        
+        # The whole import is one undo step
+        model.undo()
+        assert len(model.sections["publications"]) == before
+        print(f"✅ BibTeX import working (10,001 records in {elapsed:.2f}s)")
+        return True
+    except Exception as e:
+        print(f"❌ BibTeX import failed: {e!r}")
+        return False
+
+def test_search_index():
+    """Test that the entry search index stays in step with edits, undo and imports"""
+    print("\nTesting entry search index...")
+    
+    def linear(model, section, query):
+        words = tokenize(query)
+        return [i for i, entry in enumerate(model.sections[section])
+                if all(any(token.startswith(word) for value in entry.to_dict().values() for token in tokenize(value))
+                       for word in words)]
+    
+    try:
+        rng = random.Random(7)
+        words = ["graph", "grammar", "Lützen", "neural", "network", "theory", "quantum", "compiler"]
+        def publication():
+            return {"year": str(rng.randint(1990, 2024)), "title": " ".join(rng.sample(words, 3)),
+                    "authors": rng.choice(["Knuth", "Lovelace", "Müller"]), "venue": "J"}
+        
+        model = CVModel()
+        model.add_entries("publications", [publication() for _ in range(2000)])
+        queries = ["gra", "graph netw", "lutz", "MÜLLER", "2001", "quantum compiler knuth", "zzz", ""]
+        assert model.search_entries("publications", "gra") == linear(model, "publications", "gra")
+        
+        # Every kind of edit after the index exists is applied incrementally
+        for step in range(300):
+            size = len(model.sections["publications"])
+            action = rng.choice(["add", "insert", "edit", "delete", "undo", "redo", "batch"])
+            if action == "add":
+                model.add_entry("publications", publication())
+            elif action == "insert":
+                model.insert_entry("publications", rng.randint(0, size), publication())
+            elif action == "edit" and size:
+                model.edit_entry("publications", rng.randrange(size), publication())
+            elif action == "delete" and size:
+                model.delete_entry("publications", rng.randrange(size))
+            elif action == "undo":
+                model.undo()
+            elif action == "redo":
+                model.redo()
+            elif action == "batch":
+                model.add_entries("publications", [publication() for _ in range(5)])
+            if step % 10 == 0:
+                query = rng.choice(queries)
+                assert model.search_entries("publications", query) == linear(model, "publications", query), query
+        for query in queries:
+            assert model.search_entries("publications", query) == linear(model, "publications", query), query
+        
+        started = time.perf_counter()
+        for query in queries:
+            model.search_entries("publications", query)
+        per_query = (time.perf_counter() - started) / len(queries) * 1000
+        assert per_query < 20, f"{per_query:.1f} ms per query"
+        print(f"✅ Entry search index working ({per_query:.2f} ms per query over "
+              f"{len(model.sections['publications'])} entries)")
+        return True
+    except Exception as e:
+        print(f"❌ Entry search index failed: {e!r}")
+        return False
+
 def test_gui():
     """Test GUI functionality"""
     print("\nTesting GUI...")
     
     try:
-        root = tk.Tk()
-        app = CVEditorController(root)
-        print("✅ GUI created successfully!")
-        root.destroy()
+        with tempfile.TemporaryDirectory() as tmp:
+            root = tk.Tk()
+            model = CVModel()
+            app = CVEditorController(root, model, Autosave(model, directory=tmp))
+            print("✅ GUI created successfully!")
+            
+            # Text typed right before closing the window is journaled, not lost
+            app.view.personal_vars["name_first"].set("Ada")
+            app.close_window()
+            recovered = CVModel()
+            restarted = Autosave(recovered, directory=tmp)
+            assert restarted.attach(None) == 1
+            assert recovered.personal_info["name_first"] == "Ada"
+            restarted.close()
         return True
     except Exception as e:
         print(f"❌ GUI creation failed: {e}")
@@ -76,18 +999,102 @@ if __name__ == "__main__":
     # Test LaTeX generation
     latex_ok = test_latex_generation()
     
+    # Test incremental rendering
+    incremental_ok = test_incremental_sections()
+    
+    # Test template cache
+    template_ok = test_template_cache()
+    
     # Test PDF compilation
     pdf_ok = test_pdf_compilation()
     
+    # Test compile path without TeX
+    fake_ok = test_fake_engine_compilation()
+    
+    # Test headless batch rendering
+    batch_ok = test_batch_render()
+    
+    # Test PDF cache
+    cache_ok = test_pdf_cache()
+    
+    # Test persistent build directory
+    build_ok = test_build_directory()
+    
+    # Test precompiled preamble format
+    format_ok = test_preamble_format()
+    
+    # Test main font substitution
+    fonts_ok = test_font_resolution()
+    
+    # Test compile queue
+    queue_ok = test_compile_queue()
+    
+    # Test live preview scheduling
+    preview_ok = test_live_preview()
+    
+    # Test compile runner
+    runner_ok = test_compile_runner()
+    
+    # Test log parser
+    log_ok = test_log_parser()
+    
+    # Test section registry
+    registry_ok = test_section_registry()
+    
+    # Test LaTeX escaping
+    escape_ok = test_latex_escaping()
+    
+    # Test cold-start budget
+    startup_ok = test_startup_budget()
+    
+    # Test project file formats
+    formats_ok = test_project_formats()
+    
+    # Test autosave journal
+    autosave_ok = test_autosave()
+    
+    # Test undo/redo
+    undo_ok = test_undo_redo()
+    
+    # Test entry records
+    records_ok = test_entry_records()
+    
+    # Test BibTeX import
+    bibtex_ok = test_bibtex_import()
+    
+    # Test entry search index
+    search_ok = test_search_index()
+    
     # Test GUI
     gui_ok = test_gui()
     
     print(f"\n=== Test Results ===")
     print(f"LaTeX Generation: {'✅ PASS' if latex_ok else '❌ FAIL'}")
+    print(f"Incremental Rendering: {'✅ PASS' if incremental_ok else '❌ FAIL'}")
+    print(f"Template Cache: {'✅ PASS' if template_ok else '❌ FAIL'}")
     print(f"PDF Compilation: {'✅ PASS' if pdf_ok else '❌ FAIL'}")
+    print(f"Fake Engine Compilation: {'✅ PASS' if fake_ok else '❌ FAIL'}")
+    print(f"Batch Rendering: {'✅ PASS' if batch_ok else '❌ FAIL'}")
+    print(f"PDF Cache: {'✅ PASS' if cache_ok else '❌ FAIL'}")
+    print(f"Build Directory: {'✅ PASS' if build_ok else '❌ FAIL'}")
+    print(f"Preamble Format: {'✅ PASS' if format_ok else '❌ FAIL'}")
+    print(f"Font Resolution: {'✅ PASS' if fonts_ok else '❌ FAIL'}")
+    print(f"Compile Queue: {'✅ PASS' if queue_ok else '❌ FAIL'}")
+    print(f"Live Preview: {'✅ PASS' if preview_ok else '❌ FAIL'}")
+    print(f"Compile Runner: {'✅ PASS' if runner_ok else '❌ FAIL'}")
+    print(f"Log Parser: {'✅ PASS' if log_ok else '❌ FAIL'}")
+    print(f"Section Registry: {'✅ PASS' if registry_ok else '❌ FAIL'}")
+    print(f"LaTeX Escaping: {'✅ PASS' if escape_ok else '❌ FAIL'}")
+    print(f"Startup Budget: {'✅ PASS' if startup_ok else '❌ FAIL'}")
+    print(f"Project Formats: {'✅ PASS' if formats_ok else '❌ FAIL'}")
+    print(f"Autosave Journal: {'✅ PASS' if autosave_ok else '❌ FAIL'}")
+    print(f"Undo/Redo: {'✅ PASS' if undo_ok else '❌ FAIL'}")
+    print(f"Entry Records: {'✅ PASS' if records_ok else '❌ FAIL'}")
+    print(f"BibTeX Import: {'✅ PASS' if bibtex_ok else '❌ FAIL'}")
+    print(f"Search Index: {'✅ PASS' if search_ok else '❌ FAIL'}")
     print(f"GUI Creation: {'✅ PASS' if gui_ok else '❌ FAIL'}")
     
-    if all([latex_ok, pdf_ok, gui_ok]):
+    if all([latex_ok, incremental_ok, template_ok, pdf_ok, fake_ok, batch_ok, cache_ok, build_ok, format_ok, fonts_ok, queue_ok, preview_ok, runner_ok, log_ok, registry_ok, escape_ok, startup_ok, formats_ok, autosave_ok, undo_ok, records_ok, bibtex_ok, search_ok, gui_ok]):
         print("\n🎉 All tests passed! MVC version is working correctly.")
     else:
         print("\n⚠️  Some tests failed. Check the output above for details.") 
\ No newline at end of file
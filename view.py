@@ -1,7 +1,7 @@
 import os
-import subprocess
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog
+from sections import SECTION_TYPES
 
 class CVEditorView:
     def __init__(self, root, controller):
@@ -53,17 +53,48 @@ class CVEditorView:
         subtitle.pack(side=tk.LEFT, padx=10)
     
     def create_notebook(self):
-        self.notebook = ttk.Notebook(self.root)
-        self.notebook.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        # Notebook on the left; the live preview pane is added on the right when enabled
+        self.main_pane = ttk.PanedWindow(self.root, orient=tk.HORIZONTAL)
+        self.main_pane.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        self.notebook = ttk.Notebook(self.main_pane)
+        self.main_pane.add(self.notebook, weight=3)
+        self.preview_frame = None
         
+        # Tab contents are built on first selection; see build_tab()
+        self._tab_builders = {}
+        
+        # Widgets edited since the model last pulled their values; see pull_edits()
+        self._edited_personal = set()
+        self._edited_sections = set()
         self.create_personal_tab()
         self.create_section_tabs()
+        self.notebook.bind("<<NotebookTabChanged>>", lambda e: self.build_tab(self.notebook.select()))
+        self.build_tab(self.notebook.select())
+    
+    def add_lazy_tab(self, text, builder):
+        """Add an empty notebook tab whose contents builder(tab) creates on first selection"""
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text=text)
+        self._tab_builders[str(tab)] = lambda: builder(tab)
+        return tab
+    
+    def build_tab(self, tab):
+        """Build a tab's widgets and bind model data to them, once"""
+        builder = self._tab_builders.pop(str(tab), None)
+        if builder:
+            builder()
+    
+    def build_all_tabs(self):
+        for tab in list(self._tab_builders):
+            self.build_tab(tab)
     
     def create_personal_tab(self):
-        self.personal_tab = ttk.Frame(self.notebook)
-        self.notebook.add(self.personal_tab, text="Personal Info")
-        
-        container = ttk.Frame(self.personal_tab)
+        self.personal_fields = {}
+        self.personal_vars = {}
+        self.personal_tab = self.add_lazy_tab("Personal Info", self._build_personal_tab)
+    
+    def _build_personal_tab(self, tab):
+        container = ttk.Frame(tab)
         container.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
         # Create two columns
@@ -74,7 +105,6 @@ class CVEditorView:
         right_col.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=10)
         
         # Personal info fields
-        self.personal_fields = {}
         fields = [
             ("First Name", "name_first", "Your first name only"),
             ("Last Name", "name_last", "Your last name or surname"),
@@ -99,9 +129,11 @@ class CVEditorView:
             lbl.bind("<Enter>", lambda e, t=tip: self.show_tooltip(e, t))
             lbl.bind("<Leave>", self.hide_tooltip)
             
-            entry = ttk.Entry(frame, width=30)
+            var = tk.StringVar(value=self.controller.model.personal_info.get(key, ""))
+            entry = ttk.Entry(frame, width=30, textvariable=var)
             entry.pack(side=tk.RIGHT, fill=tk.X, expand=True)
-            entry.bind("<KeyRelease>", lambda e, k=key: self.controller.update_personal(k, e.widget.get()))
+            var.trace_add("write", lambda *args, k=key: self._field_edited(self._edited_personal, k))
+            self.personal_vars[key] = var
             
             # Add tooltip to entry field
             entry.bind("<Enter>", lambda e, t=tip: self.show_tooltip(e, t))
@@ -113,130 +145,179 @@ class CVEditorView:
         self.section_tabs = {}
         self.section_editors = {}
         self.section_visibility = {}
+        self.section_raw_latex = {}
+        self.entry_lists = {}
+        self.entry_columns = {}
+        self.entry_rows = {}  # Row ids of each list in model order, filtered or not
+        self.entry_filters = {}
         
-        sections = [
-            ("Summary", "summary", "Write a 3-5 sentence professional summary"),
-            ("Education", "education", "List your degrees and certifications"),
-            ("Experience", "experience", "Detail your professional work history"),
-            ("Research", "research", "Describe your research experience"),
-            ("Projects", "projects", "Showcase your open-source projects"),
-            ("Skills", "skills", "List your technical skills"),
-            ("Awards", "awards", "Highlight your achievements"),
-            ("Publications", "publications", "List your academic publications"),
-            ("Languages", "languages", "List languages you speak")
-        ]
-        multi_entry_sections = {
-            "education": [
-                ("Degree", "degree"),
-                ("Institution", "institution"),
-                ("Start Year", "start"),
-                ("End Year", "end"),
-                ("Details", "details")
-            ],
-            "experience": [
-                ("Job Title", "job_title"),
-                ("Company", "company"),
-                ("Start Year", "start"),
-                ("End Year", "end"),
-                ("Details", "details")
-            ],
-            "research": [
-                ("Project Title", "project_title"),
-                ("Institution", "institution"),
-                ("Start Year", "start"),
-                ("End Year", "end"),
-                ("Details", "details")
-            ],
-            "projects": [
-                ("Project Name", "project_name"),
-                ("Years", "years"),
-                ("Description", "description")
-            ],
-            "skills": [
-                ("Category", "category"),
-                ("Items", "items")
-            ],
-            "awards": [
-                ("Year", "year"),
-                ("Award Name", "award_name"),
-                ("Organization", "organization")
-            ],
-            "publications": [
-                ("Year", "year"),
-                ("Title", "title"),
-                ("Authors", "authors"),
-                ("Venue", "venue")
-            ],
-            "languages": [
-                ("Language", "language"),
-                ("Proficiency", "proficiency")
-            ]
-        }
+        for section in SECTION_TYPES:
+            self.section_tabs[section.key] = self.add_lazy_tab(
+                section.tab_label, lambda tab, s=section: self._build_section_tab(tab, s))
+    
+    def _build_section_tab(self, tab, section):
+        name, key, tip = section.tab_label, section.key, section.tip
         
-        for name, key, tip in sections:
-            tab = ttk.Frame(self.notebook)
-            self.notebook.add(tab, text=name)
-            self.section_tabs[key] = tab
-            
-            # Header with checkbox
-            header = ttk.Frame(tab)
-            header.pack(fill=tk.X, padx=10, pady=10)
-            
-            lbl = ttk.Label(header, text=f"{name} Section", font=("Arial", 11, "bold"))
-            lbl.pack(side=tk.LEFT)
-            
-            # Add tooltip to header
-            lbl.bind("<Enter>", lambda e, t=tip: self.show_tooltip(e, t))
-            lbl.bind("<Leave>", self.hide_tooltip)
-            
-            # Visibility toggle
-            var = tk.BooleanVar()
-            chk = ttk.Checkbutton(header, text="Include in PDF", variable=var,
-                                  command=lambda k=key, v=var: self.controller.toggle_section(k, v.get()))
-            chk.pack(side=tk.RIGHT, padx=10)
-            self.section_visibility[key] = (var, chk)
+        # Header with checkbox
+        header = ttk.Frame(tab)
+        header.pack(fill=tk.X, padx=10, pady=10)
+        
+        lbl = ttk.Label(header, text=f"{name} Section", font=("Arial", 11, "bold"))
+        lbl.pack(side=tk.LEFT)
+        
+        # Add tooltip to header
+        lbl.bind("<Enter>", lambda e, t=tip: self.show_tooltip(e, t))
+        lbl.bind("<Leave>", self.hide_tooltip)
+        
+        # Visibility toggle
+        var = tk.BooleanVar()
+        chk = ttk.Checkbutton(header, text="Include in PDF", variable=var,
+                              command=lambda k=key, v=var: self.controller.toggle_section(k, v.get()))
+        chk.pack(side=tk.RIGHT, padx=10)
+        self.section_visibility[key] = (var, chk)
+        
+        # Raw LaTeX opt-out: fields are escaped unless this is checked
+        raw_var = tk.BooleanVar()
+        ttk.Checkbutton(header, text="Raw LaTeX", variable=raw_var,
+                        command=lambda k=key, v=raw_var: self.controller.set_raw_latex(k, v.get())
+                        ).pack(side=tk.RIGHT, padx=10)
+        self.section_raw_latex[key] = raw_var
+        
+        if section.fields is not None:
+            # Search box: filters rows through the model's search index
+            search_frame = ttk.Frame(tab)
+            search_frame.pack(fill=tk.X, padx=10, pady=(0, 5))
+            ttk.Label(search_frame, text="Search:").pack(side=tk.LEFT)
+            query = tk.StringVar()
+            ttk.Entry(search_frame, textvariable=query, width=40).pack(side=tk.LEFT, padx=5)
+            query.trace_add("write", lambda *args, k=key, q=query: self.controller.filter_entries(k, q.get()))
+            self.entry_filters[key] = query
             
-            if key in multi_entry_sections:
-                # Pretty UI for multi-entry sections
-                frame = ttk.Frame(tab)
-                frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
-                setattr(self, f"{key}_list_frame", frame)
-                self._make_refresh_list(key, multi_entry_sections[key])()
-                btn_frame = ttk.Frame(tab)
-                btn_frame.pack(fill=tk.X, padx=10, pady=5)
-                ttk.Button(btn_frame, text=f"Add {name}", command=lambda k=key: self._entry_dialog(k, multi_entry_sections[k])).pack(side=tk.LEFT)
-            else:
-                # Text area with scrollbar for summary
-                text_frame = ttk.Frame(tab)
-                text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
-                text_area = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD, 
-                                                    font=("Consolas", 10), 
-                                                    bg="#f8f9fa", padx=10, pady=10)
-                text_area.pack(fill=tk.BOTH, expand=True)
-                text_area.bind("<KeyRelease>", lambda e, k=key: self.controller.update_section(k, e.widget.get("1.0", tk.END)))
-                text_area.bind("<Enter>", lambda e, t=tip: self.show_tooltip(e, t))
-                text_area.bind("<Leave>", self.hide_tooltip)
-                self.section_editors[key] = text_area
+            # Multi-entry sections: a Treeview only draws the rows in view
+            frame = ttk.Frame(tab)
+            frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+            self.entry_lists[key] = self._create_entry_list(frame, key, section.fields)
+            setattr(self, f"refresh_{key}_list", lambda k=key: self.reload_entry_rows(k))
+            btn_frame = ttk.Frame(tab)
+            btn_frame.pack(fill=tk.X, padx=10, pady=5)
+            ttk.Button(btn_frame, text=f"Add {name}", command=lambda k=key, f=section.fields: self._entry_dialog(k, f)).pack(side=tk.LEFT)
+            ttk.Button(btn_frame, text="Edit", command=lambda k=key, f=section.fields: self._edit_selected(k, f)).pack(side=tk.LEFT, padx=5)
+            ttk.Button(btn_frame, text="Delete", command=lambda k=key: self._delete_selected(k)).pack(side=tk.LEFT)
+            if key == "publications":
+                ttk.Button(btn_frame, text="Import BibTeX...", command=self.controller.import_bibtex
+                           ).pack(side=tk.LEFT, padx=5)
+        else:
+            # Text area with scrollbar for summary
+            text_frame = ttk.Frame(tab)
+            text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0, 10))
+            text_area = scrolledtext.ScrolledText(text_frame, wrap=tk.WORD, 
+                                                font=("Consolas", 10), 
+                                                bg="#f8f9fa", padx=10, pady=10)
+            text_area.pack(fill=tk.BOTH, expand=True)
+            text_area.bind("<<Modified>>", lambda e, k=key: self._text_modified(e.widget, k))
+            text_area.bind("<Enter>", lambda e, t=tip: self.show_tooltip(e, t))
+            text_area.bind("<Leave>", self.hide_tooltip)
+            self.section_editors[key] = text_area
+        
+        # Bind the current model data now that the widgets exist
+        model = self.controller.model
+        self.set_section_content(key, model.sections[key])
+        self.set_section_visibility(key, model.section_visibility.get(key, True))
+        self.set_section_raw_latex(key, key in model.raw_latex_sections)
+
+    def _create_entry_list(self, parent, key, fields):
+        columns = self.entry_columns[key] = [field for _, field in fields]
+        tree = ttk.Treeview(parent, columns=columns, show="headings", selectmode="browse")
+        for label, field in fields:
+            tree.heading(field, text=label)
+            tree.column(field, width=120, stretch=True)
+        scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        tree.bind("<Double-1>", lambda e: self._edit_selected(key, fields))
+        tree.bind("<Delete>", lambda e: self._delete_selected(key))
+        return tree
+
+    def _row_values(self, key, entry):
+        return tuple(str(entry.get(field, "")) for field in self.entry_columns[key])
+
+    def reload_entry_rows(self, key):
+        """Replace all rows of an entry list, e.g. after loading a project"""
+        tree = self.entry_lists[key]
+        tree.delete(*self.entry_rows.get(key, ()))
+        self.entry_rows[key] = [tree.insert("", tk.END, values=self._row_values(key, entry))
+                                for entry in self.controller.model.sections[key]]
+        self._refilter(key)
+
+    def insert_entry_row(self, key, idx, entry):
+        # Tabs that are not built yet read the model when they are
+        if key not in self.entry_lists:
+            return
+        tree = self.entry_lists[key]
+        iid = tree.insert("", idx, values=self._row_values(key, entry))
+        self.entry_rows[key].insert(idx, iid)
+        if not self._refilter(key):
+            tree.see(iid)
 
-    def _make_refresh_list(self, key, fields):
-        def refresh():
-            frame = getattr(self, f"{key}_list_frame")
-            for widget in frame.winfo_children():
-                widget.destroy()
-            # Table header
-            header = ttk.Frame(frame)
-            header.pack(fill=tk.X)
-            for i, (col, _) in enumerate(fields + [("Actions", None)]):
-                ttk.Label(header, text=col, font=("Arial", 10, "bold")).grid(row=0, column=i, padx=5, pady=2)
-            # List entries
-            for idx, entry in enumerate(self.controller.model.sections[key]):
-                row = ttk.Frame(frame)
-                row.pack(fill=tk.X, pady=2)
-                for i, (_, field) in enumerate(fields):
-                    ttk.Label(row, text=entry.get(field, "")).grid(row=0, column=i, padx=5)
-                ttk.Button(row, text="Edit", command=lambda i=idx, k=key, f=fields: self._entry_dialog(k, f, i)).grid(row=0, column=len(fields), padx=2)
-                ttk.Button(row, text="Delete", command=lambda i=idx, k=key: self._delete_entry(k, i)).grid(row=0, column=len(fields)+1, padx=2)
-        return refresh
+    def append_entry_rows(self, key, entries):
+        if key not in self.entry_lists:
+            return
+        tree = self.entry_lists[key]
+        self.entry_rows[key].extend(tree.insert("", tk.END, values=self._row_values(key, entry))
+                                    for entry in entries)
+        self._refilter(key)
+
+    def update_entry_row(self, key, idx, entry):
+        if key not in self.entry_lists:
+            return
+        tree = self.entry_lists[key]
+        tree.item(self.entry_rows[key][idx], values=self._row_values(key, entry))
+        self._refilter(key)
+
+    def delete_entry_row(self, key, idx):
+        if key not in self.entry_lists:
+            return
+        tree = self.entry_lists[key]
+        tree.delete(self.entry_rows[key].pop(idx))
+
+    def delete_entry_rows(self, key, start, count):
+        if key not in self.entry_lists:
+            return
+        tree = self.entry_lists[key]
+        tree.delete(*self.entry_rows[key][start:start + count])
+        del self.entry_rows[key][start:start + count]
+
+    def show_entry_rows(self, key, positions=None):
+        """Show only the rows at the given model positions (all rows for None)"""
+        if key not in self.entry_lists:
+            return
+        rows = self.entry_rows[key]
+        # Detached rows keep their values, so filtering never rebuilds the list
+        self.entry_lists[key].set_children("", *(rows if positions is None else [rows[p] for p in positions]))
+
+    def _refilter(self, key):
+        # Rows added or edited under an active search may not match it
+        query = self.entry_filters[key].get() if key in self.entry_filters else ""
+        if query.strip():
+            self.controller.filter_entries(key, query)
+            return True
+        return False
+
+    def _selected_index(self, key):
+        tree = self.entry_lists[key]
+        selection = tree.selection()
+        return self.entry_rows[key].index(selection[0]) if selection else None
+
+    def _edit_selected(self, key, fields):
+        idx = self._selected_index(key)
+        if idx is not None:
+            self._entry_dialog(key, fields, idx)
+
+    def _delete_selected(self, key):
+        idx = self._selected_index(key)
+        if idx is not None:
+            self._delete_entry(key, idx)
 
     def _entry_dialog(self, key, fields, idx=None):
         dialog = tk.Toplevel(self.root)
@@ -255,17 +336,18 @@ class CVEditorView:
         def save():
             new_entry = {k: e.get() for k, e in entries.items()}
             if idx is not None:
-                self.controller.model.sections[key][idx] = new_entry
+                self.controller.edit_entry(key, idx, new_entry)
+                self.update_entry_row(key, idx, new_entry)
             else:
-                self.controller.model.sections[key].append(new_entry)
+                self.controller.add_entry(key, new_entry)
+                self.insert_entry_row(key, len(self.controller.model.sections[key]) - 1, new_entry)
             dialog.destroy()
-            getattr(self, f"refresh_{key}_list")()
         ttk.Button(dialog, text="Save", command=save).pack(pady=10)
         ttk.Button(dialog, text="Cancel", command=dialog.destroy).pack()
 
     def _delete_entry(self, key, idx):
-        del self.controller.model.sections[key][idx]
-        getattr(self, f"refresh_{key}_list")()
+        self.controller.delete_entry(key, idx)
+        self.delete_entry_row(key, idx)
 
     def create_status_bar(self):
         self.status_var = tk.StringVar(value="Ready")
@@ -279,15 +361,78 @@ class CVEditorView:
         
         ttk.Button(btn_frame, text="Generate PDF", command=self.controller.generate_pdf
                   ).pack(side=tk.RIGHT, padx=5)
+        ttk.Button(btn_frame, text="Cancel", command=self.controller.cancel_compile
+                  ).pack(side=tk.RIGHT, padx=5)
         ttk.Button(btn_frame, text="Save Project", command=self.controller.save_project
                   ).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Load Project", command=self.controller.load_project
                   ).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Undo", command=self.controller.undo
+                  ).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Redo", command=self.controller.redo
+                  ).pack(side=tk.LEFT, padx=5)
+        self.root.bind_all("<Control-z>", lambda e: self.controller.undo())
+        self.root.bind_all("<Control-y>", lambda e: self.controller.redo())
+        self.root.bind_all("<Control-Z>", lambda e: self.controller.redo())
+        
+        self.live_preview_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(btn_frame, text="Live Preview", variable=self.live_preview_var,
+                        command=lambda: self.controller.set_live_preview(self.live_preview_var.get())
+                        ).pack(side=tk.LEFT, padx=10)
         
         # Progress bar
         self.progress = ttk.Progressbar(btn_frame, mode='indeterminate', length=200)
         self.progress.pack(side=tk.RIGHT, padx=10)
     
+    def create_preview_pane(self):
+        self.preview_frame = ttk.Frame(self.main_pane)
+        self.preview_status = tk.StringVar(value="")
+        ttk.Label(self.preview_frame, textvariable=self.preview_status, anchor=tk.W
+                  ).pack(fill=tk.X, padx=5, pady=(0, 5))
+        
+        canvas = tk.Canvas(self.preview_frame, bg="#7f8c8d", highlightthickness=0)
+        scrollbar = ttk.Scrollbar(self.preview_frame, orient=tk.VERTICAL, command=canvas.yview)
+        canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.preview_pages = tk.Frame(canvas, bg="#7f8c8d")
+        canvas.create_window((0, 0), window=self.preview_pages, anchor=tk.NW)
+        self.preview_pages.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+        self.preview_canvas = canvas
+        self.preview_images = []
+    
+    def show_preview_pane(self):
+        if self.preview_frame is None:
+            self.create_preview_pane()
+        if not self.preview_visible():
+            self.main_pane.add(self.preview_frame, weight=2)
+    
+    def hide_preview_pane(self):
+        if self.preview_visible():
+            self.main_pane.forget(self.preview_frame)
+    
+    def preview_visible(self):
+        if self.preview_frame is None:
+            return False
+        return str(self.preview_frame) in [str(pane) for pane in self.main_pane.panes()]
+    
+    def show_preview_status(self, text):
+        if self.preview_frame is not None:
+            self.preview_status.set(text)
+    
+    def show_preview_pages(self, pages):
+        """Replace the preview with new page images (base64 PNG strings)"""
+        if self.preview_frame is None:
+            return
+        for widget in self.preview_pages.winfo_children():
+            widget.destroy()
+        # Tk only keeps images alive while Python holds a reference
+        self.preview_images = [tk.PhotoImage(data=page) for page in pages]
+        for image in self.preview_images:
+            tk.Label(self.preview_pages, image=image, bd=0).pack(padx=10, pady=5)
+        self.preview_status.set(f"Preview: {len(pages)} page(s)")
+    
     def show_tooltip(self, event, text):
         x, y, _, _ = event.widget.bbox("insert")
         x += event.widget.winfo_rootx() + 25
@@ -300,30 +445,70 @@ class CVEditorView:
         self.tooltip.place_forget()
     
     def set_personal_field(self, key, value):
-        if key in self.personal_fields:
-            self.personal_fields[key].delete(0, tk.END)
-            self.personal_fields[key].insert(0, value)
+        if key in self.personal_vars:
+            self.personal_vars[key].set(value)
+            self._edited_personal.discard(key)
+    
+    def is_section_built(self, section):
+        return section in self.entry_lists or section in self.section_editors
     
     def set_section_content(self, section, content):
-        if section in self.section_editors:
-            self.section_editors[section].delete("1.0", tk.END)
-            self.section_editors[section].insert("1.0", content)
+        if section in self.entry_lists:
+            self.reload_entry_rows(section)
+        elif section in self.section_editors:
+            editor = self.section_editors[section]
+            editor.delete("1.0", tk.END)
+            editor.insert("1.0", content)
+            editor.edit_modified(False)
+            self._edited_sections.discard(section)
+    
+    def _field_edited(self, edited, key):
+        edited.add(key)
+        self.controller.view_edited()
+    
+    def _text_modified(self, widget, key):
+        # <<Modified>> only fires when the flag flips, so reset it to hear the next edit
+        if widget.edit_modified():
+            widget.edit_modified(False)
+            self._field_edited(self._edited_sections, key)
+    
+    def pull_edits(self):
+        """Return (personal, sections) values of the widgets edited since the last pull"""
+        personal = {key: self.personal_vars[key].get() for key in self._edited_personal}
+        sections = {key: self.section_editors[key].get("1.0", tk.END) for key in self._edited_sections}
+        self._edited_personal.clear()
+        self._edited_sections.clear()
+        return personal, sections
     
     def set_section_visibility(self, section, visible):
         if section in self.section_visibility:
             var, _ = self.section_visibility[section]
             var.set(visible)
     
+    def set_section_raw_latex(self, section, raw):
+        if section in self.section_raw_latex:
+            self.section_raw_latex[section].set(raw)
+    
     def show_message(self, message, is_error=False):
         self.status_var.set(message)
         if is_error:
             tk.messagebox.showerror("Error", message)
     
     def start_progress(self):
+        self.progress.configure(mode='indeterminate', value=0)
         self.progress.start(10)
     
+    def set_progress(self, pages_done, pages_expected=None):
+        """Show pages shipped by XeLaTeX; determinate once the page count is known"""
+        if pages_expected:
+            self.progress.stop()
+            self.progress.configure(mode='determinate', maximum=pages_expected,
+                                    value=min(pages_done, pages_expected))
+        self.status_var.set(f"Typesetting page {pages_done}...")
+    
     def stop_progress(self):
         self.progress.stop()
+        self.progress.configure(mode='indeterminate', value=0)
     
     def ask_save_path(self):
         return filedialog.asksaveasfilename(
@@ -336,6 +521,11 @@ class CVEditorView:
             filetypes=[("CV Project", "*.cvproj"), ("All Files", "*.*")]
         )
     
+    def ask_bibtex_path(self):
+        return filedialog.askopenfilename(
+            filetypes=[("BibTeX", "*.bib"), ("All Files", "*.*")]
+        )
+    
     def ask_pdf_save_path(self, first_name=None, last_name=None):
         if first_name and last_name:
             initialfile = f"{last_name}_{first_name}_Resume.pdf"
@@ -351,4 +541,5 @@ class CVEditorView:
         if os.name == 'nt':  # Windows
             os.startfile(path)
         elif os.name == 'posix':  # macOS, Linux
+            import subprocess
             subprocess.run(["open", path] if os.uname().sysname == "Darwin" else ["xdg-open", path])
\ No newline at end of file